@@ -0,0 +1,247 @@
+"""
+端到端基准：在本地启动模拟上游（stub_server.py，返回 fixtures/ 中合成的页面与接口响应，可配置延迟与错误注入），
+把插件的全部出站请求改写到该服务，按场景并发驱动 /ys、/hs、/随机小说 指令，统计吞吐量与尾延迟。
+
+插件依赖 astrbot.api，需要在安装了 AstrBot 的环境中运行：
+    python benchmarks/bench_e2e.py [-n 每个场景的请求数] [-c 并发数] [-s 场景 ...] [--latency 毫秒] [--error-rate 0.05]
+
+默认关闭各站点的限速与连接池上限（否则吞吐量只反映 host_policies 与连接池的配置），加 --keep-rate-limits 保留插件默认值；
+--set key=value 可覆盖任意插件配置（值按 JSON 解析），例如 --set stream_prefix_enabled=true。
+--keywords 控制不同关键词的个数：越小缓存命中越多，默认与请求数相同（几乎全部未命中）。
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest import mock
+
+BENCH_DIR = Path(__file__).resolve().parent
+PLUGIN_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(PLUGIN_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from stub_server import StubUpstream, add_stub_arguments, stub_options  # noqa: E402
+
+plugin_main = importlib.import_module(f"{PLUGIN_DIR.name}.main")
+import astrbot.api.message_components as Comp  # noqa: E402
+
+# 场景名 -> (说明, 插件配置覆盖, 指令方法名, 第 i 个请求的消息文本(i, 关键词个数))
+Scenario = Tuple[str, Dict, str, Callable[[int, int], str]]
+SCENARIOS: Dict[str, Scenario] = {
+    "ys_list": ("ypshuo 搜索列表", {}, "youshu_search_command", lambda i, k: f"ys 诡秘之主{i % k}"),
+    "ys_detail": ("ypshuo 搜索+详情+封面", {}, "youshu_search_command", lambda i, k: f"ys 诡秘之主{i % k} {1 + i % 15}"),
+    "youshu_list": ("youshu.me 搜索列表", {"base_url": "https://youshu.me/"}, "youshu_search_command", lambda i, k: f"ys 诡秘之主{i % k}"),
+    "youshu_detail": ("youshu.me 搜索+详情+封面", {"base_url": "https://youshu.me/"}, "youshu_search_command", lambda i, k: f"ys 诡秘之主{i % k} {1 + i % 15}"),
+    "ys_both": ("双来源合并搜索", {"search_mode": "both"}, "youshu_search_command", lambda i, k: f"ys 诡秘之主{i % k}"),
+    "ys_batch": ("批量查询 5 本", {}, "youshu_search_command", lambda i, k: "ys " + " | ".join(f"诡秘之主{(i * 5 + j) % k}" for j in range(5))),
+    "hs_list": ("uaa 搜索列表", {}, "hs_search_command", lambda i, k: f"hs 示例小说{i % k}"),
+    "hs_detail": ("uaa 搜索+简介+书评", {}, "hs_search_command", lambda i, k: f"hs 示例小说{i % k} {1 + i % 20}"),
+    "random": ("ypshuo 随机小说", {}, "youshu_random_command", lambda i, k: "随机小说"),
+    "random_youshu": ("youshu.me 随机小说", {"base_url": "https://youshu.me/"}, "youshu_random_command", lambda i, k: "随机小说"),
+}
+
+UNLIMITED_HOSTS = {name: {"rate": 0, "concurrency": 64, "max_retries": 2} for name in ("ypshuo", "youshu", "uaa", "default")}
+
+
+class BenchResult:
+    def __init__(self, chain: List):
+        self.chain = chain
+
+    def get_plain_text(self) -> str:
+        return "".join(getattr(component, "text", "") for component in self.chain)
+
+
+class BenchEvent:
+    """
+    指令所需的最小消息事件：消息文本、发送者与会话标识，以及构造回复。
+    """
+
+    def __init__(self, message: str, sender: str, platform: str):
+        self.message_str = message
+        self.platform = platform
+        self.unified_msg_origin = f"bench:group:{sender}"
+        self._sender = sender
+        self.sent: List[BenchResult] = []
+
+    def get_sender_id(self) -> str:
+        return self._sender
+
+    def get_platform_name(self) -> str:
+        return self.platform
+
+    def plain_result(self, text: str) -> BenchResult:
+        return BenchResult([Comp.Plain(text)])
+
+    def chain_result(self, chain: List) -> BenchResult:
+        return BenchResult(chain)
+
+    async def send(self, result: BenchResult) -> None:
+        self.sent.append(result)
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def classify(replies: List[BenchResult]) -> str:
+    if not replies:
+        return "no_reply"
+    text = replies[-1].get_plain_text()
+    if text.startswith("❌"):
+        return "error"
+    if text.startswith("😢"):
+        return "empty"
+    return "ok"
+
+
+async def run_scenario(name: str, args: argparse.Namespace, stub: StubUpstream, overrides: Dict) -> Dict:
+    _, scenario_config, method_name, make_message = SCENARIOS[name]
+    config = {"prefetch_enabled": False, **scenario_config, **overrides}
+    if not args.keep_rate_limits:
+        # 所有站点都被改写到同一个本地端口，连接池的单站点上限会把三个来源的请求合在一起限制
+        config.setdefault("host_policies", UNLIMITED_HOSTS)
+        config.setdefault("pool_limit", 0)
+        config.setdefault("pool_limit_per_host", 0)
+    with tempfile.TemporaryDirectory() as data_dir, \
+            mock.patch.object(plugin_main.StarTools, "get_data_dir", lambda *_: Path(data_dir)):
+        plugin = plugin_main.YoushuSearchPlugin(None, config)
+        command = getattr(plugin, method_name)
+        keywords = max(1, args.keywords or args.requests)
+        latencies: List[float] = []
+        first_replies: List[float] = []
+        outcomes: Counter = Counter()
+        counter = iter(range(-args.warmup, args.requests))
+
+        async def worker():
+            for i in counter:
+                event = BenchEvent(make_message(i, keywords), f"u{i % args.sessions}", args.platform)
+                started = time.perf_counter()
+                replies = []
+                first_reply = None
+                try:
+                    async for result in command(event):
+                        if first_reply is None:
+                            first_reply = time.perf_counter() - started
+                        replies.append(result)
+                    outcome = classify(replies + event.sent)
+                except Exception as e:
+                    outcome = f"exception:{type(e).__name__}"
+                if i >= 0:
+                    latencies.append(time.perf_counter() - started)
+                    if first_reply is not None:
+                        first_replies.append(first_reply)
+                    outcomes[outcome] += 1
+
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+        finally:
+            await plugin.terminate()
+
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "outcomes": outcomes,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies) if latencies else None,
+        "first_p50": percentile(first_replies, 0.5),
+        "first_p95": percentile(first_replies, 0.95),
+        "stages": plugin.metrics.series(),
+        "stream": dict(plugin.stream_stats),
+    }
+
+
+def ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:.0f}" if seconds is not None else "-"
+
+
+def print_report(report: Dict, show_stages: bool) -> None:
+    outcomes = ", ".join(f"{key} {count}" for key, count in sorted(report["outcomes"].items()))
+    print(
+        f"{report['name']:<14} {report['requests']:>6} {report['elapsed']:>8.2f} {report['throughput']:>9.1f} "
+        f"{ms(report['p50']):>7} {ms(report['p95']):>7} {ms(report['p99']):>7} {ms(report['max']):>7} "
+        f"{ms(report['first_p50']):>7} {ms(report['first_p95']):>7}  {outcomes}"
+    )
+    if show_stages:
+        for (stage, source, outcome), histogram in report["stages"]:
+            print(
+                f"    {stage:<11} {source:<6} {outcome:<12} n={histogram.count:<6} "
+                f"p50 {ms(histogram.percentile(0.5))}ms  p95 {ms(histogram.percentile(0.95))}ms  p99 {ms(histogram.percentile(0.99))}ms"
+            )
+        if report["stream"]["early_closes"]:
+            print(f"    流式提前断开 {report['stream']['early_closes']} 次，未读取 {report['stream']['bytes_unconsumed'] / 1024:.0f} KB")
+
+
+def parse_overrides(pairs: List[str]) -> Dict:
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+async def run(args: argparse.Namespace) -> None:
+    stub = await StubUpstream(stub_options(args)).start()
+    original_fetch = plugin_main.fetch
+
+    async def rewritten_fetch(session, url, **kwargs):
+        return await original_fetch(session, stub.rewrite(url), **kwargs)
+
+    plugin_main.fetch = rewritten_fetch
+    overrides = parse_overrides(args.set)
+    print(f"模拟上游 127.0.0.1:{stub.port}，延迟 {args.latency:.0f}±{args.jitter:.0f}ms，503 概率 {args.error_rate:.0%}，"
+          f"挂起概率 {args.timeout_rate:.0%}，挑战页概率 {args.challenge_rate:.0%}；每个场景 {args.requests} 个请求，并发 {args.concurrency}")
+    print(f"{'场景':<12} {'请求数':>4} {'耗时(s)':>6} {'吞吐(r/s)':>7} {'p50ms':>7} {'p95ms':>7} {'p99ms':>7} {'maxms':>7} {'首条p50':>5} {'首条p95':>5}  结果")
+    try:
+        for name in args.scenarios:
+            print_report(await run_scenario(name, args, stub, overrides), args.stages)
+    finally:
+        plugin_main.fetch = original_fetch
+        await stub.stop()
+    print("\n上游请求数: " + ", ".join(f"{key} {count}" for key, count in sorted(stub.requests.items())))
+    if stub.injected:
+        print("注入错误: " + ", ".join(f"{key} {count}" for key, count in sorted(stub.injected.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--requests", type=int, default=200, help="每个场景计入统计的请求数")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="并发请求数")
+    parser.add_argument("-s", "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="要运行的场景")
+    parser.add_argument("--keywords", type=int, default=0, help="不同关键词的个数，0 表示与请求数相同")
+    parser.add_argument("--sessions", type=int, default=16, help="模拟的不同用户数")
+    parser.add_argument("--platform", default="aiocqhttp", help="事件的平台适配器名称，配合 cover_file_platforms 使用")
+    parser.add_argument("--warmup", type=int, default=0, help="每个场景开始前不计入统计的请求数")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="保留插件默认的站点限速")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="覆盖插件配置，可重复")
+    parser.add_argument("--stages", action="store_true", help="同时输出插件记录的各阶段耗时")
+    parser.add_argument("-v", "--verbose", action="store_true", help="保留插件的 INFO 日志")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    if not args.verbose:
+        logger = getattr(plugin_main, "logger", None)
+        if isinstance(logger, logging.Logger):
+            logger.setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+解析器微基准：在 fixtures/ 中保存的页面上对比重构前后每页解析耗时，并校验两者输出一致；
+同时统计流式读取在各页面上需要下载的前缀大小，并校验前缀的解析结果与完整页面一致。
+
+注意：fixtures/ 中的页面是按各站点页面结构手工合成的，并非真实录制的响应（文本中有填充用的无意义内容）。
+EXPECTED 中列出了每个合成页面应解析出的关键字段，先校验解析结果与之相符，避免合成页面本身的写法有误时
+重构前后“一致地错”而不被发现。这里的一致性校验只说明在这些合成页面上重构前后的解析器、前缀与完整页面的结果相同，
+不能发现真实页面结构变化造成的问题，也不能证明 DETAIL_UNTIL / LATEST_ID_UNTIL 的截断位置在真实页面上是安全的。
+调整解析器或截断标记时，应另外用真实页面核对；可将脱敏后的真实响应以相同文件名放入 fixtures/ 再运行本脚本。
+
+用法: python benchmarks/bench_parsers.py [-n 次数]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+import legacy_parsers as legacy  # noqa: E402
+from net import MarkerMatcher  # noqa: E402
+from parsers import UAA, YOUSHU, YPSHUO  # noqa: E402
+
+FIXTURES = BENCH_DIR / "fixtures"
+YPSHUO_BASE = "https://www.ypshuo.com/"
+YOUSHU_BASE = "https://youshu.me/"
+
+CASES = [
+    ("ypshuo 详情页", "ypshuo_detail.html",
+     lambda html: legacy.parse_novel_detail(html, 1, YPSHUO_BASE),
+     lambda html: YPSHUO.parse_detail(html, YPSHUO_BASE)),
+    ("ypshuo 首页", "ypshuo_home.html",
+     lambda html: legacy.parse_latest_id(html, 1),
+     YPSHUO.parse_latest_id),
+    ("youshu.me 搜索页", "youshu_search.html",
+     legacy.parse_youshu_search,
+     YOUSHU.parse_search),
+    ("youshu.me 详情页", "youshu_detail.html",
+     lambda html: legacy.parse_novel_detail(html, 2, YOUSHU_BASE),
+     lambda html: YOUSHU.parse_detail(html, YOUSHU_BASE)),
+    ("youshu.me 详情页(跳转)", "youshu_detail.html",
+     legacy.parse_youshu_search,
+     YOUSHU.parse_search),
+    ("youshu.me 首页", "youshu_home.html",
+     lambda html: legacy.parse_latest_id(html, 2),
+     YOUSHU.parse_latest_id),
+    ("uaa 简介页", "uaa_intro.html",
+     legacy.parse_uaa_intro,
+     UAA.parse_intro),
+]
+
+# 各合成页面应解析出的关键字段；解析结果为字典时只比较这里列出的键，
+# 搜索页比较 (结果数, 总页数, 第一条结果)
+EXPECTED = {
+    "ypshuo 详情页": {
+        "novel_name": "诡秘之主", "author_name": "爱潜水的乌贼", "status": "已完结",
+        "update_time_str": "2020-05-01", "score": "9.1", "word_number": 4465200.0,
+        "tags": ["西方奇幻", "克苏鲁", "蒸汽朋克"], "image_url": "https://img.ypshuo.com/cover/1001.jpg",
+    },
+    "ypshuo 首页": 98502,
+    "youshu.me 搜索页": (20, 7, {"id": 2000, "novel_name": "诡秘之主0", "author_name": "作者0", "score": "4.2", "scorer": "512"}),
+    "youshu.me 详情页": {
+        "novel_name": "诡秘之主", "author_name": "爱潜水的乌贼", "status": "已完结",
+        "update_time_str": "2020-05-01 12:00", "score": "8.9", "platform": "起点", "category": "玄幻",
+        "word_number": 4465200.0, "tags": ["克苏鲁", "西幻", "蒸汽朋克"],
+    },
+    "youshu.me 详情页(跳转)": (1, 1, {"id": 1001, "novel_name": "诡秘之主"}),
+    "youshu.me 首页": 312285,
+    "uaa 简介页": {
+        "title": "示例小说", "author": "某作者", "status": "连载中", "score": "8.6",
+        "categories": ["都市", "校园"], "latest_update": "第一百章 结局",
+    },
+}
+
+
+def unexpected_fields(result, expected) -> list:
+    """
+    返回解析结果中与 EXPECTED 不符的字段（或整体结果）的说明，全部相符时返回空列表。
+    """
+    if isinstance(expected, dict):
+        if not isinstance(result, dict):
+            return [f"期望字典，实际为 {result!r}"]
+        return [f"{key}={result.get(key)!r}（应为 {value!r}）" for key, value in expected.items() if result.get(key) != value]
+    if isinstance(expected, tuple):
+        results, total_pages = result
+        actual = (len(results), total_pages, results[0] if results else None)
+        return [] if actual == expected else [f"{actual!r}（应为 {expected!r}）"]
+    return [] if result == expected else [f"{result!r}（应为 {expected!r}）"]
+
+
+STREAM_CASES = [
+    ("ypshuo 详情页", "ypshuo_detail.html", YPSHUO.DETAIL_UNTIL, lambda html: YPSHUO.parse_detail(html, YPSHUO_BASE)),
+    ("youshu.me 详情页", "youshu_detail.html", YOUSHU.DETAIL_UNTIL, lambda html: YOUSHU.parse_detail(html, YOUSHU_BASE)),
+    ("youshu.me 首页", "youshu_home.html", YOUSHU.LATEST_ID_UNTIL, YOUSHU.parse_latest_id),
+]
+
+
+def stream_prefix(body: bytes, until, chunk_size: int = 16384) -> bytes:
+    """
+    模拟 net.fetch 的分块读取，返回找到全部标记时已读到的前缀。
+    """
+    matcher = MarkerMatcher(until)
+    for end in range(chunk_size, len(body) + chunk_size, chunk_size):
+        if matcher.feed(body[:end]):
+            return body[:end]
+    return body
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=100, help="每个页面重复解析的次数")
+    args = parser.parse_args()
+
+    print(f"{'页面':<24}{'大小':>10}{'重构前(ms)':>14}{'重构后(ms)':>14}{'加速比':>10}")
+    mismatched = []
+    wrong = []
+    for name, fixture, before, after in CASES:
+        html = (FIXTURES / fixture).read_text(encoding="utf-8")
+        problems = unexpected_fields(after(html), EXPECTED[name])
+        if problems:
+            wrong.append(f"{name}: {'; '.join(problems)}")
+        if before(html) != after(html):
+            mismatched.append(name)
+        t_before = min(timeit.repeat(lambda: before(html), number=args.number, repeat=3)) / args.number * 1000
+        t_after = min(timeit.repeat(lambda: after(html), number=args.number, repeat=3)) / args.number * 1000
+        print(f"{name:<24}{len(html.encode('utf-8')) // 1024:>8}KB{t_before:>14.3f}{t_after:>14.3f}{t_before / t_after:>9.1f}x")
+
+    print(f"\n{'流式读取':<24}{'完整':>10}{'前缀':>10}{'节省':>8}")
+    for name, fixture, until, parse in STREAM_CASES:
+        body = (FIXTURES / fixture).read_bytes()
+        prefix = stream_prefix(body, until)
+        if parse(prefix.decode("utf-8", errors="replace")) != parse(body.decode("utf-8")):
+            mismatched.append(f"{name}(流式)")
+        print(f"{name:<24}{len(body) // 1024:>8}KB{len(prefix) // 1024:>8}KB{1 - len(prefix) / len(body):>8.0%}")
+    print("（以上基于合成页面，不代表真实页面上截断位置的安全性）")
+
+    for problem in wrong:
+        print(f"❌ 解析结果与预期字段不符 {problem}")
+    if mismatched:
+        print(f"❌ 以下页面的解析结果与重构前不一致: {', '.join(mismatched)}")
+    if wrong or mismatched:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+重构前 main.py 中的解析逻辑（逐行保留），仅用于基准测试对比与结果一致性校验。
+"""
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+YS_PLATFORMS = {"他站", "本站", "起点", "晋江", "番茄", "刺猬猫", "纵横", "飞卢", "17K", "有毒", "息壤", "铁血", "逐浪", "掌阅", "塔读", "独阅读", "少年梦", "SF", "豆瓣", "知乎", "公众号"}
+YS_CATEGORIES = {"玄幻", "奇幻", "武侠", "仙侠", "都市", "现实", "军事", "历史", "悬疑", "游戏", "竞技", "科幻", "灵异", "二次元", "同人", "其他", "穿越时空", "架空历史", "总裁豪门", "都市言情", "仙侠奇缘", "幻想言情", "悬疑推理", "耽美纯爱", "衍生同人", "轻小说", "综合其他"}
+YS_STATUSES = {"连载中", "已完结", "已太监"}
+
+
+def parse_youshu_search(html_content: str) -> tuple[List[Dict], int]:
+    results_per_page = 20
+
+    def clean_html(raw_html):
+        return re.sub(r'<[^>]+>', '', raw_html).strip()
+
+    if '共有<b class="hot">' in html_content:
+        total_results = 0
+        total_match = re.search(r'共有<b class="hot">\s*(\d+)\s*</b>条结果', html_content)
+        if total_match:
+            total_results = int(total_match.group(1))
+
+        total_pages = (total_results + results_per_page - 1) // results_per_page if total_results > 0 else 1
+
+        results = []
+        result_blocks = re.findall(r'<div class="c_row">.*?<div class="cb"></div>', html_content, re.DOTALL)
+
+        for block in result_blocks:
+            book_info = {}
+            name_match = re.search(r'<span class="c_subject"><a href="/book/(\d+)">(.*?)</a></span>', block, re.DOTALL)
+            if name_match:
+                book_info['id'] = int(name_match.group(1))
+                book_info['novel_name'] = clean_html(name_match.group(2))
+
+            author_match = re.search(r'<span class="c_label">作者：</span><span class="c_value">(.*?)</span>', block, re.DOTALL)
+            if author_match:
+                book_info['author_name'] = clean_html(author_match.group(1))
+
+            score_match = re.search(r'<span class="c_rr">([\d.]+)</span>', block)
+            if score_match:
+                book_info['score'] = score_match.group(1)
+
+            scorer_match = re.search(r'<span class="stard">\((\d+)人评分\)</span>', block)
+            if scorer_match:
+                book_info['scorer'] = scorer_match.group(1)
+
+            if 'id' in book_info and 'novel_name' in book_info:
+                results.append(book_info)
+
+        return results, total_pages
+    else:
+        name_match = re.search(r'<title>(.*?)-.*?-优书网</title>', html_content)
+        id_match = re.search(r"uservote\.php\?id=(\d+)|rating\('\d+',\s*'(\d+)'\)|addbookcase\.php\?bid=(\d+)", html_content)
+
+        if name_match and id_match:
+            novel_id_str = next((gid for gid in id_match.groups() if gid is not None), None)
+            if novel_id_str:
+                novel_name = clean_html(name_match.group(1))
+                novel_id = int(novel_id_str)
+                results = [{'id': novel_id, 'novel_name': novel_name}]
+                total_pages = 1
+                return results, total_pages
+
+        return [], 0
+
+
+def parse_latest_id(html_content: str, api: int) -> Optional[int]:
+    if api == 1:
+        matches = re.findall(r'href="/novel/(\d+)\.html"', html_content)
+        if matches:
+            return max([int(id) for id in matches])
+        return None
+    new_book_section_match = re.search(
+        r'<div class="blocktitle">新书自助推荐.*?</div>\s*<div class="blockcontent">.*?</ul>',
+        html_content, re.DOTALL)
+    if not new_book_section_match:
+        return None
+    new_book_block = new_book_section_match.group(0)
+    matches = re.findall(r'href="/book/(\d+)"', new_book_block)
+    if matches:
+        return max([int(id) for id in matches])
+    return None
+
+
+def parse_novel_detail(html_content: str, api: int, base_api_url: str) -> Dict:
+    def clean_html_content(text):
+        if not text:
+            return '无'
+        text = re.sub(r'<[^>]+>', '', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        text = re.sub(r'\.{3,}全文$', '...', text).strip()
+        return text if text else '无'
+
+    novel_info = {}
+
+    if api == 1:
+        og_image_match = re.search(r'<meta[^>]*?name="og:image"[^>]*?content="(.*?)"', html_content)
+        if og_image_match:
+            image_url = og_image_match.group(1)
+            if image_url.startswith('//'):
+                image_url = 'https:' + image_url
+            elif image_url.startswith('/'):
+                image_url = urljoin(base_api_url, image_url)
+            novel_info['image_url'] = image_url
+        else:
+            image_match = re.search(r'<img src="(.*?)"[^>]*?class="book-img"', html_content)
+            if image_match:
+                image_url = image_match.group(1)
+                if image_url.startswith('/'):
+                    image_url = urljoin(base_api_url, image_url)
+                novel_info['image_url'] = image_url
+            else:
+                novel_info['image_url'] = None
+        name_match = re.search(r'<h1 class="book-name".*?>(.*?)</h1>', html_content, re.DOTALL)
+        novel_info['novel_name'] = name_match.group(1).strip() if name_match else '无'
+        author_match = re.search(r'作者：<span class="text-red-500".*?>(.*?)</span>', html_content)
+        novel_info['author_name'] = author_match.group(1).strip() if author_match else '无'
+        novel_info['tags'] = []
+        tag_block_match = re.search(r'<div class="tag-list"[^>]*?>(.*?)</div>', html_content, re.DOTALL)
+        if tag_block_match:
+            tag_html = tag_block_match.group(1)
+            tags_list = re.findall(r'<span[^>]*?>(.*?)</span>', tag_html)
+            if tags_list:
+                novel_info['tags'] = [tag.strip() for tag in tags_list if tag.strip()]
+        word_count_match = re.search(r'字数：(.*?)万字', html_content)
+        if word_count_match:
+            try:
+                word_str = word_count_match.group(1).strip().replace(',', '')
+                novel_info['word_number'] = float(word_str) * 10000
+            except (ValueError, TypeError):
+                novel_info['word_number'] = None
+        else:
+            novel_info['word_number'] = None
+        score_data_matches = re.findall(r'<div class="item"[^>]*?>\s*<p class="score"[^>]*?>\s*(.*?)\s*</p>\s*<p[^>]*?>(.*?)</p>\s*</div>', html_content, re.DOTALL)
+        novel_info['score'] = '无'
+        novel_info['scorer'] = '无'
+        for value, label in score_data_matches:
+            if label.strip() == '评分':
+                novel_info['score'] = value.strip()
+            elif label.strip() == '评分人数':
+                novel_info['scorer'] = value.strip()
+        status_match = re.search(r'状态：\s*(.*?)\s*<', html_content)
+        novel_info['status'] = status_match.group(1).strip() if status_match else '无'
+        update_time_match = re.search(r'更新时间：\s*(.*?)\s*</div>', html_content)
+        novel_info['update_time_str'] = update_time_match.group(1).strip() if update_time_match else '无'
+        reviews = []
+        review_item_regex = re.compile(
+            r'<div class="author-info"[^>]*?>(.*?)</div>'r'.*?'r'aria-valuenow="([^"]+)"'r'.*?'r'<span class="content-inner-details"[^>]*?>(.*?)</span>', re.DOTALL)
+        all_reviews = review_item_regex.findall(html_content)
+        for author, rating, content_block in all_reviews[:3]:
+            content = re.sub(r'<[^>]+>', '', content_block)
+            content = re.sub(r'[\r\n\t]+', '', content).strip()
+            content = re.sub(r'\.{3,}全文$', '...', content).strip()
+            if content:
+                reviews.append({'author': author.strip(), 'content': content, 'rating': rating})
+        novel_info['reviews'] = reviews
+        synopsis_match = re.search(r'<div style="white-space:pre-wrap;"[^>]*?>(.*?)</div>', html_content, re.DOTALL)
+        synopsis_content = synopsis_match.group(1).strip() if synopsis_match else '无'
+        novel_info['synopsis'] = synopsis_content
+        link_match = re.search(r'<a href="(http.*?)".*?rel="nofollow".*?>', html_content)
+        novel_info['link'] = link_match.group(1).strip() if link_match else '无'
+        return novel_info
+
+    name_match = re.search(r'<title>(.*?)-.*?-优书网</title>', html_content)
+    novel_info['novel_name'] = clean_html_content(name_match.group(1)) if name_match else '无'
+    author_match = re.search(r'作者：<a.*?>(.*?)</a>', html_content)
+    novel_info['author_name'] = clean_html_content(author_match.group(1)) if author_match else '无'
+    score_match = re.search(r'<span class="ratenum">(.*?)</span>', html_content)
+    scorer_match = re.search(r'\((.*?)人已评\)', html_content)
+    novel_info['score'] = clean_html_content(score_match.group(1)) if score_match else '无'
+    novel_info['scorer'] = clean_html_content(scorer_match.group(1)) if scorer_match else '无'
+    update_time_match = re.search(r'最后更新：(.*?)</td>', html_content)
+    novel_info['update_time_str'] = clean_html_content(update_time_match.group(1)) if update_time_match else '无'
+    synopsis_match = re.search(r'<div class="tabvalue"[^>]*?>\s*<div[^>]*?>(.*?)</div>', html_content, re.DOTALL)
+    novel_info['synopsis'] = clean_html_content(synopsis_match.group(1)) if synopsis_match else '无'
+    link_match = re.search(r'<a class="btnlink b_hot mbs" href="(.*?)"', html_content)
+    novel_info['link'] = clean_html_content(link_match.group(1)) if link_match else '无'
+    img_match = re.search(r'<a[^>]*?class="book-detail-img"[^>]*?><img src="(.*?)"', html_content)
+    novel_info['image_url'] = urljoin(base_api_url, img_match.group(1).strip()) if img_match and img_match.group(1).strip() else None
+    novel_info.update({'platform': '无', 'category': '无', 'status': '无', 'word_number': None})
+    info_exp_match = re.search(r'<div class="author-item-exp">(.*?)</div>', html_content, re.DOTALL)
+    if info_exp_match:
+        raw_text = info_exp_match.group(1).replace('<i class="author-item-line"></i>', '|')
+        clean_text = re.sub(r'<[^>]+>', '', raw_text)
+        info_parts = [part.strip() for part in clean_text.split('|') if part.strip()]
+        for part in info_parts:
+            if part in YS_PLATFORMS:
+                novel_info['platform'] = part
+            elif part in YS_CATEGORIES:
+                novel_info['category'] = part
+            elif part in YS_STATUSES:
+                novel_info['status'] = part
+            elif '字' in part:
+                word_match = re.search(r'(\d+)', part)
+                if word_match:
+                    novel_info['word_number'] = float(word_match.group(1))
+    novel_info['tags'] = []
+    tag_section_match = re.search(r'<b>标签：</b>(.*?)</div>', html_content, re.DOTALL)
+    if tag_section_match:
+        tag_block = tag_section_match.group(1)
+        tags = re.findall(r'<a[^>]*?>(.*?)</a>', tag_block)
+        if tags:
+            novel_info['tags'] = [clean_html_content(tag) for tag in tags]
+    reviews = []
+    review_blocks = re.findall(r'<div class="c_row cf">.*?<div class="c_tag">', html_content, re.DOTALL)
+    for block in review_blocks[:5]:
+        author_match = re.search(r'<p>(.*?)</p></a>\s*<p><div class="user-level">', block, re.DOTALL)
+        rating_match = re.search(r'<span title="(\d+)\s*颗星"', block, re.DOTALL)
+        content_match = re.search(r'<div class="c_description">(.*?)</div>', block, re.DOTALL)
+        if author_match and rating_match and content_match:
+            author = clean_html_content(author_match.group(1))
+            rating = rating_match.group(1)
+            content = clean_html_content(content_match.group(1))
+            if content and content != '无':
+                reviews.append({'author': author, 'content': content, 'rating': rating})
+    novel_info['reviews'] = reviews
+    return novel_info
+
+
+def parse_uaa_intro(html_content: str) -> Dict:
+    novel_info = {}
+    def clean_text(text):
+        return text.strip() if text else '无'
+
+    title_match = re.search(r'<h1>(.*?)</h1>', html_content)
+    novel_info['title'] = clean_text(title_match.group(1)) if title_match else '无'
+
+    author_match = re.search(r'作者：\s*<a.*?>(.*?)</a>', html_content)
+    novel_info['author'] = clean_text(author_match.group(1)) if author_match else '无'
+
+    status_match = re.search(r'<span class="update_state">状态：(.*?)</span>', html_content)
+    novel_info['status'] = clean_text(status_match.group(1)) if status_match else '无'
+
+    score_match = re.search(r'评分：<span>(.*?)</span>', html_content)
+    novel_info['score'] = clean_text(score_match.group(1)) if score_match else '无'
+
+    intro_match = re.search(r'<div class="txt ellipsis">小说简介：(.*?)(?:</div>|<div class="arrow")', html_content, re.DOTALL)
+    novel_info['intro'] = clean_text(intro_match.group(1)) if intro_match else '无'
+
+    tags = re.findall(r'<li><a href="/novel/list\?tag=.*?"><b>#</b>(.*?)</a></li>', html_content)
+    novel_info['tags'] = tags if tags else []
+
+    category_block_match = re.search(r'<div class="item">\s*题材：\s*(.*?)</div>', html_content, re.DOTALL)
+    if category_block_match:
+        categories = re.findall(r'<a.*?>(.*?)</a>', category_block_match.group(1))
+        novel_info['categories'] = [cat.strip() for cat in categories]
+    else:
+        novel_info['categories'] = []
+
+    update_match = re.search(r'<div class="item">\s*最新：(.*?)\s*</div>', html_content)
+    novel_info['latest_update'] = clean_text(update_match.group(1)) if update_match else '无'
+    return novel_info
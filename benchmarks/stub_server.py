@@ -0,0 +1,218 @@
+"""
+模拟上游站点的本地 aiohttp 服务，按请求路径返回 fixtures/ 中合成的页面与接口响应（按站点结构手工构造，非真实录制），
+可配置响应延迟、下行带宽与错误注入，供端到端基准使用。
+
+插件请求的 https://<站点>/<路径> 经 StubUpstream.rewrite() 改写为 http://127.0.0.1:<端口>/<站点>/<路径>，
+服务据此区分 ypshuo.com、youshu.me 与 uaa 三个来源。
+
+单独运行: python benchmarks/stub_server.py [--port 8765] [--latency 毫秒] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import random
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+CHALLENGE_PAGE = b"<html><head><title>Just a moment...</title></head><body><div id=\"challenge-platform\"></div></body></html>"
+
+
+@dataclass
+class StubOptions:
+    """
+    latency/jitter 单位为秒；bandwidth 为每秒字节数，0 表示不限速。
+    error_rate、timeout_rate、challenge_rate 为每个请求返回 503、挂起 hang_seconds 秒、返回挑战页的概率；
+    missing_rate 为书籍ID不存在（详情页 404）的比例，按ID确定，同一ID每次结果相同。
+    """
+    latency: float = 0.05
+    jitter: float = 0.02
+    bandwidth: float = 0
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_seconds: float = 30.0
+    challenge_rate: float = 0.0
+    missing_rate: float = 0.0
+    chunk_size: int = 16384
+    seed: Optional[int] = None
+
+
+class StubUpstream:
+    def __init__(self, options: StubOptions, host: str = "127.0.0.1", port: int = 0):
+        self.options = options
+        self.host = host
+        self.port = port
+        self.requests: Counter = Counter()
+        self.injected: Counter = Counter()
+        self._random = random.Random(options.seed)
+        self._fixtures: Dict[str, bytes] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def fixture(self, name: str) -> bytes:
+        body = self._fixtures.get(name)
+        if body is None:
+            body = self._fixtures[name] = (FIXTURES / name).read_bytes()
+        return body
+
+    def rewrite(self, url: str) -> str:
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"http://{self.host}:{self.port}/{parts.hostname}{parts.path or '/'}{query}"
+
+    async def start(self) -> "StubUpstream":
+        app = web.Application()
+        app.router.add_route("GET", "/{site}/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _missing(self, novel_id: str) -> bool:
+        if self.options.missing_rate <= 0:
+            return False
+        return zlib.crc32(novel_id.encode()) % 10000 < self.options.missing_rate * 10000
+
+    def _route(self, site: str, path: str, request: web.Request) -> Tuple[str, Optional[bytes]]:
+        """
+        返回 (名称, 响应体)，响应体为 None 表示 404。名称用于按接口统计请求数。
+        """
+        if path.endswith((".jpg", ".jpeg", ".png", ".webp", ".gif")):
+            return "cover", self.fixture("cover.jpg")
+        if "ypshuo" in site:
+            if path == "api/novel/search":
+                return "ypshuo_search", self.fixture("ypshuo_search.json")
+            if path.startswith("novel/"):
+                novel_id = path[len("novel/"):].split(".")[0]
+                return "ypshuo_detail", None if self._missing(novel_id) else self.fixture("ypshuo_detail.html")
+            if path == "":
+                return "ypshuo_home", self.fixture("ypshuo_home.html")
+        elif "youshu" in site:
+            if path.startswith("search/"):
+                return "youshu_search", self.fixture("youshu_search.html")
+            if path.startswith("book/"):
+                novel_id = path[len("book/"):].strip("/")
+                return "youshu_detail", None if self._missing(novel_id) else self.fixture("youshu_detail.html")
+            if path == "":
+                return "youshu_home", self.fixture("youshu_home.html")
+        elif "uaa" in site:
+            if path == "api/novel/app/novel/search":
+                return "uaa_search", self.fixture("uaa_search.json")
+            if path == "api/novel/app/novel/comments":
+                return "uaa_comments", self.fixture("uaa_comments.json")
+            if path == "novel/intro":
+                novel_id = request.query.get("id", "")
+                return "uaa_intro", None if self._missing(novel_id) else self.fixture("uaa_intro.html")
+        return "unknown", None
+
+    @staticmethod
+    def _content_type(name: str) -> str:
+        if name == "cover":
+            return "image/jpeg"
+        if name.endswith(("_search", "_comments")) and not name.startswith("youshu"):
+            return "application/json"
+        return "text/html"
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        options = self.options
+        name, body = self._route(request.match_info["site"], request.match_info["path"], request)
+        self.requests[name] += 1
+        delay = options.latency + self._random.uniform(0, options.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < options.error_rate:
+            self.injected["503"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+        roll -= options.error_rate
+        if roll < options.timeout_rate:
+            self.injected["timeout"] += 1
+            await asyncio.sleep(options.hang_seconds)
+            return web.Response(status=504)
+        roll -= options.timeout_rate
+        if roll < options.challenge_rate and name != "cover":
+            self.injected["challenge"] += 1
+            return web.Response(status=403, body=CHALLENGE_PAGE, content_type="text/html", headers={"cf-mitigated": "challenge"})
+
+        if body is None:
+            return web.Response(status=404, text="Not Found")
+        content_type = self._content_type(name)
+        if options.bandwidth <= 0:
+            return web.Response(body=body, content_type=content_type, charset=None if name == "cover" else "utf-8")
+
+        # 按带宽分块发送，使流式读取提前断开时能体现出节省的下载时间
+        response = web.StreamResponse(headers={"Content-Type": content_type if name == "cover" else f"{content_type}; charset=utf-8"})
+        response.content_length = len(body)
+        await response.prepare(request)
+        try:
+            for start in range(0, len(body), options.chunk_size):
+                chunk = body[start:start + options.chunk_size]
+                await response.write(chunk)
+                await asyncio.sleep(len(chunk) / options.bandwidth)
+            await response.write_eof()
+        except ConnectionResetError:
+            # 客户端读到所需前缀后主动断开
+            pass
+        return response
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=50, help="每个请求的基础延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=20, help="在基础延迟上追加的随机延迟上限（毫秒）")
+    parser.add_argument("--bandwidth", type=float, default=0, help="每个响应的下行带宽（KB/s），0 为不限速")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="挂起不响应的概率")
+    parser.add_argument("--hang", type=float, default=30, help="挂起请求的时长（秒）")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="返回挑战页的概率")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="书籍ID不存在（404）的比例")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+
+
+def stub_options(args: argparse.Namespace) -> StubOptions:
+    return StubOptions(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        bandwidth=args.bandwidth * 1024,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang,
+        challenge_rate=args.challenge_rate,
+        missing_rate=args.missing_rate,
+        seed=args.seed,
+    )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    stub = await StubUpstream(stub_options(args), port=args.port).start()
+    print(f"模拟上游已启动: http://{stub.host}:{stub.port}/<站点>/<路径>，Ctrl+C 退出")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
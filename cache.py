@@ -0,0 +1,205 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    归一化搜索关键词：去除首尾空白、合并连续空白并统一大小写。
+    """
+    return " ".join(keyword.split()).casefold()
+
+
+class TTLCache:
+    """
+    带过期时间的 LRU 缓存。超过容量时淘汰最久未使用的条目，并记录命中/未命中次数。
+
+    stale_ttl > 0 时，过期条目会再保留 stale_ttl 秒，可通过 get_stale() 取回，
+    用于条件请求重新验证等场景；lookup() 提供 stale-while-revalidate 语义的查询。
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600, stale_ttl: float = 0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.stale_ttl = max(0.0, float(stale_ttl))
+        self._data: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # 写入次数，用于判断自上次持久化以来内容是否有变化
+        self.writes = 0
+        # 各条目被 lookup() 命中的次数，用于判断热门条目
+        self._lookups: Dict[Hashable, int] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._data[key]
+                self._lookups.pop(key, None)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def lookup(self, key: Hashable, grace: float = 0, refresh_ahead: float = 0, popular_hits: int = 0) -> tuple[Any, bool]:
+        """
+        stale-while-revalidate 查询，返回 (value, needs_refresh)，未命中时 value 为 None。
+
+        过期不超过 grace 秒（且仍在 stale_ttl 保留期内）的条目照常返回，并标记需要刷新；
+        命中次数达到 popular_hits 的热门条目在剩余有效期不足 refresh_ahead 秒时也标记需要刷新，
+        以便在过期前由调用方在后台提前刷新。popular_hits 为 0 时不提前刷新。
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        value, expires_at = entry
+        now = time.monotonic()
+        remaining = expires_at - now
+        if remaining <= 0 and -remaining >= min(grace, self.stale_ttl):
+            if expires_at + self.stale_ttl <= now:
+                del self._data[key]
+                self._lookups.pop(key, None)
+            self.misses += 1
+            return None, False
+        self._data.move_to_end(key)
+        self.hits += 1
+        count = self._lookups[key] = self._lookups.get(key, 0) + 1
+        if remaining <= 0:
+            return value, True
+        return value, 0 < popular_hits <= count and remaining < refresh_ahead
+
+    def get_stale(self, key: Hashable) -> Optional[tuple[Any, bool]]:
+        """
+        返回 (value, is_fresh)，允许取回仍在保留期内的过期条目；不计入命中统计。
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        now = time.monotonic()
+        if expires_at + self.stale_ttl <= now:
+            del self._data[key]
+            self._lookups.pop(key, None)
+            return None
+        return value, expires_at > now
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        self.writes += 1
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self._lookups.pop(evicted, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        self._lookups.pop(key, None)
+        if entry is not None:
+            self.writes += 1
+        return entry[0] if entry is not None else default
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._lookups.clear()
+        self.writes += 1
+
+    def snapshot(self) -> List[tuple[Hashable, Any, float]]:
+        """
+        按从旧到新的 LRU 顺序导出仍在有效期或保留期内的条目 (key, value, 剩余有效秒数)。
+        剩余秒数为负表示已过期、只能通过 get_stale() 取回。
+        """
+        now = time.monotonic()
+        return [(key, value, expires_at - now) for key, (value, expires_at) in self._data.items() if expires_at + self.stale_ttl > now]
+
+    def restore(self, items: Iterable[tuple[Hashable, Any, float]]) -> int:
+        """
+        导入 snapshot() 格式的条目，返回导入数量。已存在的键视为更新，不会被覆盖；
+        导入的条目排在现有条目之前（更早被淘汰）。
+        """
+        now = time.monotonic()
+        restored: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        for key, value, remaining in items:
+            if key not in self._data and remaining + self.stale_ttl > 0:
+                restored[key] = (value, now + remaining)
+        if not restored:
+            return 0
+        count = len(restored)
+        restored.update(self._data)
+        self._data = restored
+        while len(self._data) > self.maxsize:
+            # 最先淘汰的是排在前面的导入条目
+            self._data.popitem(last=False)
+            count -= 1
+        return max(0, count)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class SingleFlight:
+    """
+    合并相同 key 的并发调用：同一时刻只真正执行一次，其余调用方等待并共享同一结果（或异常）。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            self.executed += 1
+
+            def _forget(done: asyncio.Future):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            future.add_done_callback(_forget)
+        else:
+            self.shared += 1
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            # shield：某个调用方被取消时，不影响其他仍在等待同一结果的调用方
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # 最后一个等待者也被取消时，真正取消底层请求
+            if self._waiters[future] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List
+
+
+def _to_hashable(value: Any) -> Hashable:
+    """
+    JSON 会把元组存成数组，读回时把数组还原为元组，才能作为缓存的键。
+    """
+    if isinstance(value, list):
+        return tuple(_to_hashable(item) for item in value)
+    return value
+
+
+class CacheStore:
+    """
+    TTLCache 快照的 SQLite 持久化，键与值以 JSON 保存，过期时间换算为墙上时间，重启后按剩余时间恢复。
+    每个缓存按名称整体替换保存；无法序列化为 JSON 的条目会被跳过。
+
+    所有方法均为阻塞的数据库操作，应在事件循环外执行。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "cache TEXT NOT NULL, seq INTEGER NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (cache, seq))"
+        )
+        return conn
+
+    def save(self, snapshots: Dict[str, Iterable[tuple[Hashable, Any, float]]]) -> int:
+        """
+        保存 {缓存名: TTLCache.snapshot()}，返回写入的条目数。
+        """
+        now = time.time()
+        rows = []
+        for name, items in snapshots.items():
+            for seq, (key, value, remaining) in enumerate(items):
+                try:
+                    rows.append((name, seq, json.dumps(key, ensure_ascii=False), json.dumps(value, ensure_ascii=False), now + remaining))
+                except (TypeError, ValueError):
+                    continue
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM entries WHERE cache = ?", [(name,) for name in snapshots])
+                conn.executemany("INSERT INTO entries (cache, seq, key, value, expires_at) VALUES (?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+        return len(rows)
+
+    def load(self, names: Iterable[str]) -> Dict[str, List[tuple[Hashable, Any, float]]]:
+        """
+        读取各缓存保存的条目，返回 {缓存名: [(key, value, 剩余有效秒数)]}，顺序与保存时一致。
+        """
+        now = time.time()
+        snapshots: Dict[str, List[tuple[Hashable, Any, float]]] = {}
+        conn = self._connect()
+        try:
+            for name in names:
+                rows = conn.execute("SELECT key, value, expires_at FROM entries WHERE cache = ? ORDER BY seq", (name,)).fetchall()
+                items = []
+                for key, value, expires_at in rows:
+                    try:
+                        items.append((_to_hashable(json.loads(key)), json.loads(value), expires_at - now))
+                    except ValueError:
+                        continue
+                snapshots[name] = items
+        finally:
+            conn.close()
+        return snapshots
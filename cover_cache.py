@@ -0,0 +1,165 @@
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class CoverCache:
+    """
+    封面图片的磁盘缓存，以 URL（及处理参数 variant）的 SHA-256 作为文件名（内容寻址）。
+
+    磁盘部分按总字节数上限做 LRU 淘汰（以文件 mtime 记录最近访问时间，重启后依然有效）；
+    另外在内存中保留少量已编码为 base64 的热点封面，避免重复读盘和编码。
+    所有方法均为同步阻塞调用，应通过 asyncio.to_thread 等方式在事件循环外执行。
+    磁盘索引在首次访问时才扫描目录建立，构造函数本身不做任何磁盘 I/O，可以在事件循环中直接创建。
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 100 * 1024 * 1024, hot_size: int = 32):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self.hot_size = max(0, int(hot_size))
+        self._lock = threading.Lock()
+        self._hot: "OrderedDict[str, str]" = OrderedDict()
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._loaded = False
+
+    @staticmethod
+    def key_for(url: str, variant: str = "") -> str:
+        if variant:
+            url = f"{url}#{variant}"
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key
+
+    def _ensure_loaded(self) -> None:
+        """
+        首次访问时创建缓存目录并扫描已有文件，调用方需持有 _lock。
+        """
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+        self._loaded = True
+
+    def _load_index(self) -> None:
+        entries = []
+        for path in self.directory.iterdir():
+            if not path.is_file() or path.suffix == ".tmp":
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _remember_hot(self, key: str, encoded: str) -> None:
+        if self.hot_size <= 0:
+            return
+        self._hot[key] = encoded
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def _evict(self) -> None:
+        while self._files and self._total_bytes > self.max_bytes:
+            key, size = self._files.popitem(last=False)
+            self._total_bytes -= size
+            self._hot.pop(key, None)
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get_base64(self, url: str, variant: str = "") -> Optional[str]:
+        """
+        返回缓存中封面的 base64 编码，未命中时返回 None。
+        """
+        key = self.key_for(url, variant)
+        with self._lock:
+            self._ensure_loaded()
+            encoded = self._hot.get(key)
+            if encoded is not None:
+                self._hot.move_to_end(key)
+                if key in self._files:
+                    self._files.move_to_end(key)
+                self.hits += 1
+                return encoded
+            if key not in self._files:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except FileNotFoundError:
+                self._total_bytes -= self._files.pop(key)
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+            encoded = base64.b64encode(data).decode()
+            self._remember_hot(key, encoded)
+            self.hits += 1
+            return encoded
+
+    def get_path(self, url: str, variant: str = "") -> Optional[Path]:
+        """
+        返回缓存中封面文件的路径，未命中时返回 None。用于向支持本地文件的平台直接发送文件。
+        """
+        key = self.key_for(url, variant)
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._files:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                self._total_bytes -= self._files.pop(key)
+                self._hot.pop(key, None)
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+            self.hits += 1
+            return path
+
+    def _write(self, key: str, data: bytes) -> Optional[Path]:
+        if len(data) > self.max_bytes:
+            return None
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._total_bytes += len(data) - self._files.pop(key, 0)
+        self._files[key] = len(data)
+        self._evict()
+        return path if key in self._files else None
+
+    def store(self, url: str, data: bytes, variant: str = "") -> Optional[Path]:
+        """
+        写入封面字节，返回文件路径；超过缓存上限无法保存时返回 None。
+        """
+        key = self.key_for(url, variant)
+        with self._lock:
+            self._ensure_loaded()
+            return self._write(key, data)
+
+    def put(self, url: str, data: bytes, variant: str = "") -> str:
+        """
+        写入封面字节，返回其 base64 编码。
+        """
+        key = self.key_for(url, variant)
+        encoded = base64.b64encode(data).decode()
+        with self._lock:
+            self._ensure_loaded()
+            self._remember_hot(key, encoded)
+            self._write(key, data)
+        return encoded
@@ -0,0 +1,48 @@
+import io
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 为可选依赖，未安装时封面按原样发送
+    Image = None
+    ImageOps = None
+
+PILLOW_AVAILABLE = Image is not None
+
+# cover_format 取值 -> Pillow 的编码格式名
+FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+
+def cover_variant(fmt: str, max_dimension: int, quality: int) -> str:
+    """
+    处理参数的标识，参与封面缓存的键，修改配置后不会命中按旧参数处理的缓存。原图为空字符串。
+    """
+    if fmt not in FORMATS:
+        return ""
+    return f"{fmt}-{max_dimension}-q{quality}"
+
+
+def process_cover(data: bytes, fmt: str, max_dimension: int, quality: int) -> bytes:
+    """
+    把封面缩放到最长边不超过 max_dimension 像素并以 fmt 格式、quality 质量重新编码。
+    Pillow 未安装、数据无法识别为图片，或处理后并不比原图小时，原样返回 data。
+    为模块级纯函数，可在线程池或进程池中执行。
+    """
+    target = FORMATS.get(fmt)
+    if target is None or Image is None:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max_dimension > 0:
+                # JPEG 可在解码时直接按 1/2、1/4、1/8 缩小，大图省去大部分解码开销
+                image.draft("RGB", (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(image)
+            if max_dimension > 0:
+                image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            if target == "JPEG" or image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if target == "WEBP" and image.mode in ("RGBA", "LA", "P") else "RGB")
+            output = io.BytesIO()
+            image.save(output, target, quality=quality, optimize=target == "JPEG")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return data
+    processed = output.getvalue()
+    return processed if len(processed) < len(data) else data
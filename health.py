@@ -0,0 +1,141 @@
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class SourceUnavailableError(Exception):
+    """
+    来源的熔断器处于打开状态，请求未发出即失败。
+    """
+
+    def __init__(self, source: str, retry_in: float):
+        super().__init__(f"来源 {source} 暂时不可用，约 {retry_in:.0f}s 后重试")
+        self.source = source
+        self.retry_in = retry_in
+
+
+class SourceHealth:
+    """
+    单个来源的健康度统计与熔断器。
+
+    最近 window 次请求的耗时与成败用于计算 p50/p95 与错误率。连续失败达到 failure_threshold 次，
+    或遇到挑战页（Cookie 失效时 Cloudflare 返回的验证页面）时熔断打开，期间请求直接失败；
+    open_seconds 后进入半开状态，只放行一个探测请求：成功则恢复，失败则重新打开并加倍等待时长。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, window: int = 100, failure_threshold: int = 5, open_seconds: float = 60, max_open_seconds: float = 900):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(open_seconds, max_open_seconds)
+        self._samples: deque = deque(maxlen=max(1, window))
+        self._consecutive_failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._current_open_seconds = open_seconds
+        self._probe_inflight = False
+        self.challenges = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._current_open_seconds:
+            return self.HALF_OPEN
+        return self._state
+
+    @property
+    def retry_in(self) -> float:
+        if self._state != self.OPEN:
+            return 0.0
+        return max(0.0, self._current_open_seconds - (time.monotonic() - self._opened_at))
+
+    def available(self) -> bool:
+        """
+        不占用半开探测名额地判断当前是否可以向该来源发请求，用于选择来源。
+        """
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_inflight)
+
+    def acquire(self) -> bool:
+        """
+        请求发出前调用。返回 False 表示熔断中应直接失败；半开状态下只有一个调用方能拿到探测名额。
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_inflight:
+            self._probe_inflight = True
+            return True
+        return False
+
+    def record_success(self, latency: float) -> None:
+        self._samples.append((latency, True))
+        self._consecutive_failures = 0
+        self._probe_inflight = False
+        if self._state != self.CLOSED:
+            self._state = self.CLOSED
+            self._current_open_seconds = self.open_seconds
+
+    def record_failure(self, latency: float, error: str, challenge: bool = False) -> bool:
+        """
+        记录一次失败，返回本次是否导致熔断打开。
+        """
+        self._samples.append((latency, False))
+        self._consecutive_failures += 1
+        self.last_error = error
+        if challenge:
+            self.challenges += 1
+        was_probe = self._probe_inflight
+        self._probe_inflight = False
+        if was_probe:
+            self._current_open_seconds = min(self.max_open_seconds, self._current_open_seconds * 2)
+            self._open()
+            return True
+        if self._state == self.CLOSED and (challenge or self._consecutive_failures >= self.failure_threshold):
+            self._open()
+            return True
+        return False
+
+    def release(self) -> None:
+        """
+        请求被取消、未得出结论时归还半开探测名额。
+        """
+        self._probe_inflight = False
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def percentile(self, q: float) -> Optional[float]:
+        latencies = sorted(latency for latency, _ in self._samples)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def summary(self) -> Dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "state": self.state,
+            "samples": len(self._samples),
+            "p50": p50,
+            "p95": p95,
+            "error_rate": self.error_rate,
+            "challenges": self.challenges,
+            "last_error": self.last_error,
+        }
+
+    def describe(self) -> str:
+        s = self.summary()
+        p50 = f"{s['p50'] * 1000:.0f}ms" if s["p50"] is not None else "-"
+        p95 = f"{s['p95'] * 1000:.0f}ms" if s["p95"] is not None else "-"
+        return f"{self.name}: {s['state']}, p50 {p50}, p95 {p95}, 错误率 {s['error_rate']:.0%}, 挑战页 {s['challenges']} 次"
@@ -0,0 +1,180 @@
+import os
+import random
+import time
+from array import array
+from pathlib import Path
+from typing import Collection, Optional
+
+
+class _Bitmap:
+    """
+    按需增长的位图，第 n 位表示 ID n 是否在集合中。
+    """
+
+    def __init__(self, data: bytes = b""):
+        self._bits = bytearray(data)
+
+    def __contains__(self, n: int) -> bool:
+        byte = n >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (n & 7)))
+
+    def add(self, n: int) -> bool:
+        byte = n >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(b"\x00" * (byte + 1 - len(self._bits)))
+        mask = 1 << (n & 7)
+        if self._bits[byte] & mask:
+            return False
+        self._bits[byte] |= mask
+        return True
+
+    def discard(self, n: int) -> bool:
+        byte = n >> 3
+        if byte >= len(self._bits) or not self._bits[byte] & (1 << (n & 7)):
+            return False
+        self._bits[byte] &= ~(1 << (n & 7)) & 0xFF
+        return True
+
+    def __iter__(self):
+        for byte_index, byte in enumerate(self._bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (byte_index << 3) | bit
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
+
+    def count(self) -> int:
+        return bin(int.from_bytes(self._bits, "little")).count("1")
+
+
+class NovelIdIndex:
+    """
+    单个来源的书籍ID索引。两张位图分别记录确认存在与确认 404 的ID，
+    并以 <name>.valid.bin / <name>.invalid.bin 持久化到磁盘。
+
+    load()/save() 为阻塞的文件操作，应在事件循环外执行；其余方法只操作内存。
+    """
+
+    def __init__(self, directory: Path, name: str, flush_interval: float = 300):
+        self.directory = Path(directory)
+        self.name = name
+        self.flush_interval = flush_interval
+        self._valid = _Bitmap()
+        self._invalid = _Bitmap()
+        self._valid_ids = array("I")
+        self._invalid_count = 0
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self.loaded = False
+
+    def _path(self, kind: str) -> Path:
+        return self.directory / f"{self.name}.{kind}.bin"
+
+    def load(self) -> None:
+        for kind in ("valid", "invalid"):
+            path = self._path(kind)
+            if path.exists():
+                setattr(self, f"_{kind}", _Bitmap(path.read_bytes()))
+        self._valid_ids = array("I", self._valid)
+        self._invalid_count = self._invalid.count()
+        self.loaded = True
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for kind, bitmap in (("valid", self._valid), ("invalid", self._invalid)):
+            path = self._path(kind)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(bitmap.to_bytes())
+            os.replace(tmp_path, path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def should_flush(self) -> bool:
+        return self._dirty and time.monotonic() - self._last_flush >= self.flush_interval
+
+    @property
+    def valid_count(self) -> int:
+        return len(self._valid_ids)
+
+    def is_valid(self, novel_id: int) -> bool:
+        return novel_id in self._valid
+
+    def is_invalid(self, novel_id: int) -> bool:
+        return novel_id in self._invalid
+
+    def coverage(self, upper: int) -> float:
+        """
+        1..upper 中已确认状态（存在或 404）的ID所占比例。
+        已知存在的ID数 / 估计的存在总数（upper × 已知样本中存在的比例）恰好等于这一比例。
+        """
+        if upper <= 0:
+            return 0.0
+        return min(1.0, (len(self._valid_ids) + self._invalid_count) / upper)
+
+    def mark_valid(self, novel_id: int) -> None:
+        if self._valid.add(novel_id):
+            self._valid_ids.append(novel_id)
+            self._dirty = True
+        if self._invalid.discard(novel_id):
+            self._invalid_count -= 1
+            self._dirty = True
+
+    def mark_invalid(self, novel_id: int) -> None:
+        if self._invalid.add(novel_id):
+            self._invalid_count += 1
+            self._dirty = True
+        if self._valid.discard(novel_id):
+            self._valid_ids.remove(novel_id)
+            self._dirty = True
+
+    def random_valid(self, exclude: Collection[int] = (), max_tries: int = 32) -> Optional[int]:
+        """
+        从已确认存在的ID中随机抽取一个不在 exclude 中的ID，抽样多次仍失败时返回 None。
+        """
+        if not self._valid_ids:
+            return None
+        for _ in range(max_tries):
+            novel_id = random.choice(self._valid_ids)
+            if novel_id not in exclude:
+                return novel_id
+        return None
+
+    def random_unknown(self, upper: int, exclude: Collection[int] = (), max_tries: int = 32) -> Optional[int]:
+        """
+        在 1..upper 中随机抽取一个尚未确认状态、且不在 exclude 中的ID，抽样多次仍失败时返回 None。
+        """
+        for _ in range(max_tries):
+            novel_id = random.randint(1, upper)
+            if novel_id not in self._valid and novel_id not in self._invalid and novel_id not in exclude:
+                return novel_id
+        return None
+
+    def random_candidate(self, upper: int, prefer_known: float, exclude: Collection[int] = ()) -> int:
+        """
+        抽取一个随机候选ID，始终跳过已确认 404 的ID，并尽量避开 exclude（如最近返回过的ID）。
+
+        从已确认存在的ID中抽取的概率为 prefer_known × coverage(upper)：索引只覆盖一小部分ID时，
+        已知ID只是用户看过的少数几本书，若总是优先抽取它们，结果就不再随机；覆盖率越高越接近 prefer_known。
+        """
+        if self._valid_ids and random.random() < prefer_known * self.coverage(upper):
+            known = self.random_valid(exclude)
+            if known is not None:
+                return known
+        novel_id = self.random_unknown(upper, exclude)
+        if novel_id is not None:
+            return novel_id
+        known = self.random_valid(exclude)
+        if known is not None:
+            return known
+        for _ in range(32):
+            novel_id = random.randint(1, upper)
+            if novel_id not in self._invalid and novel_id not in exclude:
+                return novel_id
+        return random.randint(1, upper)
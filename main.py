@@ -1,16 +1,33 @@
 import asyncio
 import aiohttp
+import multiprocessing
+import os
 import random
 import re
-import base64
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Optional
-from urllib.parse import urljoin, quote
+from urllib.parse import urljoin, urlparse, quote
 
 from astrbot.api.event import filter, AstrMessageEvent, MessageEventResult
-from astrbot.api.star import Context, Star, register
+from astrbot.api.star import Context, Star, StarTools, register
 import astrbot.api.message_components as Comp
 from astrbot.api import logger
 
+from .cache import SingleFlight, TTLCache, normalize_keyword
+from .cache_store import CacheStore
+from .cover_cache import CoverCache
+from .cover_image import FORMATS, PILLOW_AVAILABLE, cover_variant, process_cover
+from .health import SourceHealth, SourceUnavailableError
+from .id_index import NovelIdIndex
+from .metrics import Metrics
+from .net import ChallengePageError, FetchResult, HostPolicy, conditional_headers, connect_trace_config, fetch
+from .parsers import detail_fields, detail_until, encode_base64, latest_id_until, parse_hs_intro, parse_latest_id, parse_novel_detail, parse_search_page, timed_decode_and_parse
+from .title_index import TitleIndex, normalize_title
+
 @register(
     "astrbot_plugin_youshusearch",  # 插件ID
     "Foolllll",                    # 作者名
@@ -35,32 +52,758 @@ class YoushuSearchPlugin(Star):
         }
         
         logger.info(f"优书搜索插件(ys)初始化，使用的基础URL: {self.base_api_url}")
-        if self.base_api_url == "https://www.ypshuo.com/":
-            self.api = 1
-            self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
+        self.api = 1 if self.base_api_url == "https://www.ypshuo.com/" else 2
+        # 两个来源各自的基础URL与请求头：api 1 为 ypshuo.com 的 JSON 接口，api 2 为 youshu.me 的 HTML 页面
+        self.api_base_urls = {
+            1: "https://www.ypshuo.com/",
+            2: self.base_api_url if self.api == 2 else "https://youshu.me/",
         }
-        else:
-            self.api = 2
-            self.headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:143.0) Gecko/20100101 Firefox/143.0", 
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "zh-CN,zh;q=0.8,zh-TW;q=0.7,zh-HK;q=0.5,en-US;q=0.3,en;q=0.2",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-            "Cookie": self.COOKIE_STRING,
-            "Referer": self.base_api_url
+        self.api_headers = {
+            1: {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
+                "Accept": "application/json, text/plain, */*",
+                "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Connection": "keep-alive",
+            },
+            2: {
+                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:143.0) Gecko/20100101 Firefox/143.0", 
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "zh-CN,zh;q=0.8,zh-TW;q=0.7,zh-HK;q=0.5,en-US;q=0.3,en;q=0.2",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+                "Cookie": self.COOKIE_STRING,
+                "Referer": self.api_base_urls[2],
+            },
         }
+        self.headers = self.api_headers[self.api]
+        # single: 只使用 base_url 对应的来源；both: /ys 同时搜索两个来源并合并结果
+        self.search_mode = str(config.get("search_mode", "single")).lower()
+        self.both_search_deadline = float(config.get("both_search_deadline", 8))
+        # 批量查询：一条 /ys 中用 | 或换行分隔多个书名，并发查询后合并为一条摘要
+        self.batch_max_titles = max(2, int(config.get("batch_max_titles", 10)))
+        self.batch_concurrency = max(1, int(config.get("batch_concurrency", 4)))
+        self.batch_deadline = float(config.get("batch_deadline", 15))
+
+
+        # 连接池配置：整个插件生命周期共用一个 ClientSession
+        self.search_timeout = float(config.get("search_timeout", 20))
+        self.detail_timeout = float(config.get("detail_timeout", 10))
+        # 详情流程中与主请求并发的分支（hs 书评、封面）各自的等待上限，超时只影响该分支
+        self.review_timeout = float(config.get("review_timeout", 5))
+        self.cover_timeout = float(config.get("cover_timeout", 6))
+        # 文字详情不等封面，解析完成即发送，封面随后作为单独的消息补发
+        self.cover_followup = bool(config.get("cover_followup", False))
+        self.connect_timeout = float(config.get("connect_timeout", 5))
+        self.pool_limit = int(config.get("pool_limit", 30))
+        self.pool_limit_per_host = int(config.get("pool_limit_per_host", 6))
+        self.keepalive_timeout = float(config.get("keepalive_timeout", 60))
+        self.dns_cache_ttl = int(config.get("dns_cache_ttl", 300))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+        # 合并相同上游请求的并发调用
+        self._single_flight = SingleFlight()
+        # 各阶段耗时统计，可定期导出为 Prometheus 文本文件
+        self.metrics = Metrics()
+        self.metrics_export_path = str(config.get("metrics_export_path", "")).strip()
+        self.metrics_export_interval = max(5.0, float(config.get("metrics_export_interval", 60)))
+        self._metrics_task: Optional[asyncio.Task] = None
+        # 首页与详情页只读取解析所需的前缀，读够即断开连接
+        self.stream_prefix_enabled = bool(config.get("stream_prefix_enabled", False))
+        self.stream_stats = {"early_closes": 0, "bytes_read": 0, "bytes_unconsumed": 0, "fallbacks": 0}
+        # 各站点的限速、并发与重试策略
+        host_policies = config.get("host_policies") or {}
+        self._host_policies: Dict[str, HostPolicy] = {}
+        for name, defaults in (
+            ("ypshuo", {"rate": 4, "burst": 8, "concurrency": 6}),
+            ("youshu", {"rate": 2, "burst": 4, "concurrency": 3}),
+            ("uaa", {"rate": 2, "burst": 4, "concurrency": 3}),
+            ("default", {"rate": 0, "burst": 1, "concurrency": 6}),
+        ):
+            options = {**defaults, **(host_policies.get(name) or {})}
+            self._host_policies[name] = HostPolicy(
+                name,
+                rate=float(options["rate"]),
+                burst=int(options["burst"]),
+                concurrency=int(options["concurrency"]),
+                max_retries=int(options.get("max_retries", 2)),
+                backoff_base=float(options.get("backoff_base", 0.5)),
+                backoff_max=float(options.get("backoff_max", 8)),
+            )
+        # 各来源的延迟/错误率统计与熔断器，/ys 与 /随机小说 据此选择可用的来源
+        health_window = int(config.get("health_window", 100))
+        circuit_failure_threshold = int(config.get("circuit_failure_threshold", 5))
+        circuit_open_seconds = float(config.get("circuit_open_seconds", 60))
+        self._source_health: Dict[str, SourceHealth] = {
+            name: SourceHealth(name, window=health_window, failure_threshold=circuit_failure_threshold, open_seconds=circuit_open_seconds)
+            for name in ("ypshuo", "youshu", "uaa")
+        }
+
+        # stale-while-revalidate：缓存过期后 swr_grace 秒内仍直接返回旧结果并在后台刷新；
+        # 被命中 refresh_popular_hits 次以上的热门条目在剩余有效期不足 refresh_ahead_ratio 时提前在后台刷新
+        self.swr_grace = max(0.0, float(config.get("swr_grace", 600)))
+        self.refresh_popular_hits = max(0, int(config.get("refresh_popular_hits", 5)))
+        self.refresh_ahead_ratio = min(1.0, max(0.0, float(config.get("refresh_ahead_ratio", 0.2))))
+        self._refresh_tasks: Dict[tuple, asyncio.Task] = {}
+
+        # 搜索结果缓存：(来源, API模式, 归一化关键词, 页码) -> (results, total_pages)
+        self.search_cache = TTLCache(
+            maxsize=int(config.get("search_cache_size", 256)),
+            ttl=float(config.get("search_cache_ttl", 600)),
+            stale_ttl=self.swr_grace,
+        )
+        # 详情缓存：(API模式, 书籍ID) -> 解析后的详情及 ETag/Last-Modified，过期后仍保留一段时间用于条件请求
+        self.detail_cache = TTLCache(
+            maxsize=int(config.get("detail_cache_size", 512)),
+            ttl=float(config.get("detail_cache_ttl", 1800)),
+            stale_ttl=max(self.swr_grace, float(config.get("detail_revalidate_window", 86400))),
+        )
+
+        # 负缓存：各站点无结果的搜索、404 的页面与挑战页在短时间内直接返回，不再请求上游；容量与正常结果的缓存分开计算
+        self.negative_cache_ttl = float(config.get("negative_cache_ttl", 300))
+        self.negative_challenge_ttl = float(config.get("negative_challenge_ttl", 60))
+        self.negative_caches: Dict[str, TTLCache] = {
+            name: TTLCache(maxsize=int(config.get("negative_cache_size", 256)), ttl=self.negative_cache_ttl)
+            for name in ("ypshuo", "youshu", "uaa")
+        }
+
+        # 搜索、详情与最新ID缓存保存到数据目录，重启后在第一条指令时载入（封面缓存本身就在磁盘上）
+        self.cache_persist_enabled = bool(config.get("cache_persist_enabled", True))
+        self.cache_persist_interval = max(30.0, float(config.get("cache_persist_interval", 300)))
+        self._cache_store: Optional[CacheStore] = None
+        self._cache_load_lock = asyncio.Lock()
+        self._cache_persist_task: Optional[asyncio.Task] = None
+        self._persisted_writes: Dict[str, int] = {}
+
+        # 各会话（群聊或私聊）最近一次展示的结果列表，使 `/ys 3`、`/hs 5` 无需重新输入书名和搜索
+        self.result_cursors = TTLCache(
+            maxsize=int(config.get("result_cursor_size", 512)),
+            ttl=float(config.get("result_cursor_ttl", 1800)),
+        )
+
+        # 最新书籍ID缓存，避免每次 /随机小说 都抓取首页
+        self.latest_id_cache = TTLCache(maxsize=4, ttl=float(config.get("latest_id_ttl", 3600)), stale_ttl=self.swr_grace)
+        # /随机小说 每轮并发探测的ID数量，以及对单个站点的探测并发上限
+        self.random_probe_batch = max(1, int(config.get("random_probe_batch", 3)))
+        self.random_probe_concurrency = max(1, int(config.get("random_probe_concurrency", 3)))
+        self._probe_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # 书籍ID索引：记录确认存在/404 的ID，使随机抽取尽量一次命中
+        self.id_index_enabled = bool(config.get("id_index_enabled", True))
+        self.id_index_prefer_known = float(config.get("id_index_prefer_known", 0.9))
+        # 每个来源最近由 /随机小说 返回过的ID，抽取候选时尽量避开
+        self._recent_random_ids: Dict[int, deque] = {}
+        self.random_recent_size = max(0, int(config.get("random_recent_size", 50)))
+        self.id_crawler_enabled = bool(config.get("id_crawler_enabled", False))
+        self.id_crawler_interval = max(1.0, float(config.get("id_crawler_interval", 60)))
+        self._id_indexes: Dict[int, NovelIdIndex] = {}
+        # 本地书名索引：收录搜索结果与详情页中的书名/作者，/ys 高置信度命中时跳过远程搜索
+        self.title_index_enabled = bool(config.get("title_index_enabled", False))
+        self.title_index_min_score = float(config.get("title_index_min_score", 0.85))
+        self.title_index_max_entries = int(config.get("title_index_max_entries", 20000))
+        self._title_index: Optional[TitleIndex] = None
+        self._title_index_lock = asyncio.Lock()
+        self.title_index_stats = {"lookups": 0, "hits": 0}
+        self._id_crawler_task: Optional[asyncio.Task] = None
+
+        # 列表查询后的后台预取：下一页搜索结果与前几条书籍详情
+        self.prefetch_enabled = bool(config.get("prefetch_enabled", False))
+        self.prefetch_detail_count = max(0, int(config.get("prefetch_detail_count", 3)))
+        self._prefetch_semaphore = asyncio.Semaphore(max(1, int(config.get("prefetch_max_inflight", 4))))
+        self._prefetch_tasks: Dict[str, tuple[tuple, asyncio.Task]] = {}
+
+        # 解析与编码的执行方式: thread（线程池）、process（进程池）或 inline（直接在事件循环中执行）
+        self.parse_executor_mode = str(config.get("parse_executor", "thread")).lower()
+        self.parse_workers = max(1, int(config.get("parse_workers", 2)))
+        self._executor: Optional[Executor] = None
+
+        self.data_dir = StarTools.get_data_dir("astrbot_plugin_youshusearch")
+        self.cover_cache: Optional[CoverCache] = None
+        if config.get("cover_cache_enabled", True):
+            self.cover_cache = CoverCache(
+                self.data_dir / "covers",
+                max_bytes=int(float(config.get("cover_cache_max_mb", 100)) * 1024 * 1024),
+                hot_size=int(config.get("cover_hot_size", 32)),
+            )
+        # 封面处理：限制尺寸并重新编码为 JPEG/WebP 后再发送与缓存（需要 Pillow），original 为按原图发送
+        self.cover_format = str(config.get("cover_format", "original")).lower()
+        self.cover_max_dimension = int(config.get("cover_max_dimension", 600))
+        self.cover_quality = int(config.get("cover_quality", 80))
+        if self.cover_format in FORMATS and not PILLOW_AVAILABLE:
+            logger.warning("未安装 Pillow，封面将按原图发送。")
+            self.cover_format = "original"
+        self.cover_variant = cover_variant(self.cover_format, self.cover_max_dimension, self.cover_quality)
+        # 这些平台的封面以本地文件路径发送，省去 base64 编码与传输（需启用封面缓存）
+        self.cover_file_platforms = set(config.get("cover_file_platforms") or [])
+
+    def _client_timeout(self, total: float) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=total, connect=self.connect_timeout)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        懒加载插件共用的连接池会话，复用 TCP/TLS 连接与 DNS 缓存。
+        """
+        if self._session is not None and not self._session.closed:
+            return self._session
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_limit,
+                    limit_per_host=self.pool_limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=self._client_timeout(self.search_timeout),
+                    trace_configs=[connect_trace_config(self._on_connect)],
+                )
+                self._ensure_metrics_exporter()
+                logger.info(f"已创建共享HTTP连接池 (每主机上限 {self.pool_limit_per_host}, DNS缓存 {self.dns_cache_ttl}s)")
+        return self._session
+
+    def _prefetch_owner(self, event: AstrMessageEvent) -> str:
+        return f"{event.unified_msg_origin}:{event.get_sender_id()}"
+
+    def _cancel_stale_prefetch(self, event: AstrMessageEvent, query_key: tuple):
+        """
+        同一用户发起了不同的查询时，取消其上一次列表查询遗留的预取任务。
+        """
+        current = self._prefetch_tasks.get(self._prefetch_owner(event))
+        if current is not None and current[0] != query_key and not current[1].done():
+            current[1].cancel()
+
+    def _schedule_prefetch(self, event: AstrMessageEvent, query_key: tuple, keyword: str, page: int, max_pages: int, results: List[Dict], api: Optional[int] = None):
+        """
+        列表回复发出后，在后台预热下一页搜索结果与前几条书籍的详情（含封面）。
+        """
+        if not self.prefetch_enabled:
+            return
+        owner = self._prefetch_owner(event)
+        self._cancel_stale_prefetch(event, query_key)
+        task = asyncio.create_task(self._prefetch_list_followups(query_key[0], keyword, page, max_pages, results, api))
+        self._prefetch_tasks[owner] = (query_key, task)
+
+        def _cleanup(done_task: asyncio.Task):
+            if self._prefetch_tasks.get(owner, (None, None))[1] is done_task:
+                del self._prefetch_tasks[owner]
+        task.add_done_callback(_cleanup)
+
+    async def _prefetch_list_followups(self, source: str, keyword: str, page: int, max_pages: int, results: List[Dict], api: Optional[int] = None):
+        session = await self._get_session()
+        jobs = []
+        if page < max_pages:
+            if source == "hs":
+                jobs.append(lambda: self._perform_hs_search(session, keyword, page=page + 1))
+            elif self.search_mode == "both":
+                jobs.append(lambda: self._perform_merged_search(session, keyword, page=page + 1))
+            else:
+                jobs.append(lambda: self._perform_search(session, keyword, page=page + 1, api=api))
+        for book in results[:self.prefetch_detail_count]:
+            novel_id = book.get('id')
+            if not novel_id:
+                continue
+            if source == "hs":
+                jobs.append(lambda novel_id=str(novel_id): self._fetch_hs_info(session, novel_id))
+            else:
+                jobs.append(lambda novel_id=str(novel_id), api=book.get('api', api): self._prefetch_novel(session, novel_id, api))
+        await asyncio.gather(*(self._run_prefetch_job(job) for job in jobs))
+
+    async def _prefetch_novel(self, session: aiohttp.ClientSession, novel_id: str, api: Optional[int] = None):
+        novel_info = await self._fetch_novel_info(session, novel_id, api)
+        if self.cover_cache is not None and novel_info.get('image_url'):
+            await self._get_cover_base64(session, novel_info['image_url'])
+
+    def _cache_lookup(self, cache: TTLCache, key) -> tuple:
+        """
+        按 stale-while-revalidate 规则查询缓存，返回 (value, needs_refresh)。
+        """
+        return cache.lookup(key, grace=self.swr_grace, refresh_ahead=cache.ttl * self.refresh_ahead_ratio, popular_hits=self.refresh_popular_hits)
+
+    def _refresh_in_background(self, key: tuple, job):
+        """
+        在后台执行缓存刷新 job()，与预取共用并发上限；同一 key 已有刷新在进行时不重复发起。
+        """
+        if key in self._refresh_tasks:
+            return
+        task = asyncio.create_task(self._run_prefetch_job(job))
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+
+    async def _run_prefetch_job(self, job):
+        async with self._prefetch_semaphore:
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"预取失败: {e}")
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None:
+            if self.parse_executor_mode == "process":
+                # spawn 方式避免 fork 带有事件循环和线程的 Bot 主进程
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            elif self.parse_executor_mode == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix="ys_parse")
+        return self._executor
+
+    async def _run_in_worker(self, func, *args):
+        """
+        将 CPU 密集的解码、解析或编码任务交给工作池执行，避免阻塞事件循环。
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def _parse_in_worker(self, source: str, parse, result: FetchResult, *args):
+        """
+        在工作池中解码并解析响应体，分别记录解码与解析耗时。
+        """
+        try:
+            parsed, decode_seconds, parse_seconds = await self._run_in_worker(
+                timed_decode_and_parse, parse, result.body, result.charset, *args
+            )
+        except Exception:
+            self.metrics.observe("parse", source, "error", 0.0)
+            raise
+        self.metrics.observe("decode", source, "ok", decode_seconds)
+        self.metrics.observe("parse", source, "ok", parse_seconds)
+        return parsed
+
+    @staticmethod
+    def _host_name(host: str) -> str:
+        for suffix, name in (("ypshuo.com", "ypshuo"), ("youshu.me", "youshu"), ("uaa001.com", "uaa")):
+            if host == suffix or host.endswith("." + suffix):
+                return name
+        return "default"
+
+    def _host_policy(self, url: str) -> HostPolicy:
+        return self._host_policies[self._host_name(urlparse(url).hostname or "")]
+
+    def _source_label(self, host: str) -> str:
+        """
+        统计中使用的来源标签："1"（ypshuo.com）、"2"（youshu.me）、"hs"（uaa）或 "other"。
+        """
+        return {"ypshuo": "1", "youshu": "2", "uaa": "hs"}.get(self._host_name(host), "other")
+
+    def _on_connect(self, host: str, seconds: float):
+        self.metrics.observe("connect", self._source_label(host), "ok", seconds)
+
+    @staticmethod
+    def _fetch_outcome(error: BaseException) -> str:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return f"http_{error.status}"
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        if isinstance(error, ChallengePageError):
+            return "challenge"
+        if isinstance(error, SourceUnavailableError):
+            return "circuit_open"
+        return "error"
+
+    async def _timed_command(self, name: str, results):
+        """
+        转发指令的回复并记录整条指令的耗时与首条回复的耗时。结果按最后一条回复判定：❌ 记为 error，😢 记为 empty。
+        """
+        started = time.perf_counter()
+        outcome = "ok"
+        first_reply = True
+        await self._ensure_caches_loaded()
+        try:
+            async for result in results:
+                get_text = getattr(result, "get_plain_text", None)
+                text = get_text() if callable(get_text) else ""
+                if text.startswith("❌"):
+                    outcome = "error"
+                elif text.startswith("😢"):
+                    outcome = "empty"
+                else:
+                    outcome = "ok"
+                if first_reply:
+                    first_reply = False
+                    self.metrics.observe("first_reply", name, outcome, time.perf_counter() - started)
+                yield result
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self.metrics.observe("command", name, outcome, time.perf_counter() - started)
+
+    def _persistent_caches(self) -> Dict[str, TTLCache]:
+        return {"search": self.search_cache, "detail": self.detail_cache, "latest_id": self.latest_id_cache}
+
+    async def _ensure_caches_loaded(self):
+        """
+        第一次调用时从数据目录载入上次保存的缓存，并启动定期保存任务。放在首条指令而非初始化中执行，
+        避免拖慢插件加载。
+        """
+        if not self.cache_persist_enabled or self._cache_store is not None:
+            return
+        async with self._cache_load_lock:
+            if self._cache_store is not None:
+                return
+            store = CacheStore(self.data_dir / "caches.db")
+            caches = self._persistent_caches()
+            try:
+                snapshots = await asyncio.to_thread(store.load, list(caches))
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ 载入持久化缓存失败: {e}")
+                snapshots = {}
+            restored = {name: caches[name].restore(items) for name, items in snapshots.items()}
+            self._persisted_writes = {name: cache.writes for name, cache in caches.items()}
+            self._cache_store = store
+            if any(restored.values()):
+                logger.info("已载入持久化缓存: " + ", ".join(f"{name} {count} 条" for name, count in restored.items()))
+            self._cache_persist_task = asyncio.create_task(self._cache_persist_loop())
+
+    async def _persist_caches(self):
+        """
+        保存自上次保存以来有变化的缓存。
+        """
+        if self._cache_store is None:
+            return
+        changed = {name: cache for name, cache in self._persistent_caches().items() if cache.writes != self._persisted_writes.get(name)}
+        if not changed:
+            return
+        writes = {name: cache.writes for name, cache in changed.items()}
+        try:
+            saved = await asyncio.to_thread(self._cache_store.save, {name: cache.snapshot() for name, cache in changed.items()})
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"⚠️ 保存持久化缓存失败: {e}")
+            return
+        self._persisted_writes.update(writes)
+        logger.debug(f"已保存持久化缓存 {saved} 条 ({', '.join(changed)})")
+
+    async def _cache_persist_loop(self):
+        while True:
+            await asyncio.sleep(self.cache_persist_interval)
+            await self._persist_caches()
+
+    def _metrics_gauges(self) -> Dict:
+        caches = {"search": self.search_cache, "detail": self.detail_cache, "latest_id": self.latest_id_cache}
+        hit_ratio = {(("cache", name),): cache.hit_rate for name, cache in caches.items()}
+        # 每次请求都会先查负缓存，未命中是常态，命中率没有意义，只报告命中次数
+        caches.update({f"negative_{name}": cache for name, cache in self.negative_caches.items()})
+        if self.cover_cache is not None:
+            lookups = self.cover_cache.hits + self.cover_cache.misses
+            hit_ratio[(("cache", "cover"),)] = self.cover_cache.hits / lookups if lookups else 0.0
+        if self.title_index_stats["lookups"]:
+            hit_ratio[(("cache", "title_index"),)] = self.title_index_stats["hits"] / self.title_index_stats["lookups"]
+        return {
+            "cache_hit_ratio": hit_ratio,
+            "cache_entries": {(("cache", name),): len(cache) for name, cache in caches.items()},
+            "negative_cache_hits_total": {(("source", name),): cache.hits for name, cache in self.negative_caches.items()},
+            "singleflight_shared_total": {(): self._single_flight.shared},
+            "stream_bytes_unconsumed_total": {(): self.stream_stats["bytes_unconsumed"]},
+            "circuit_open": {(("source", name),): int(health.state != health.CLOSED) for name, health in self._source_health.items()},
+        }
+
+    def _ensure_metrics_exporter(self):
+        if self.metrics_export_path and (self._metrics_task is None or self._metrics_task.done()):
+            self._metrics_task = asyncio.create_task(self._metrics_export_loop())
+
+    def _metrics_export_file(self) -> Path:
+        path = Path(self.metrics_export_path)
+        return path if path.is_absolute() else self.data_dir / path
+
+    def _write_metrics_file(self, text: str):
+        path = self._metrics_export_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    async def _export_metrics(self):
+        try:
+            await asyncio.to_thread(self._write_metrics_file, self.metrics.render_prometheus(self._metrics_gauges()))
+        except OSError as e:
+            logger.warning(f"⚠️ 导出统计数据失败: {e}")
+
+    async def _metrics_export_loop(self):
+        logger.info(f"统计数据将每 {self.metrics_export_interval}s 导出到 {self._metrics_export_file()}")
+        while True:
+            await asyncio.sleep(self.metrics_export_interval)
+            await self._export_metrics()
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, *, params: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None, timeout: Optional[aiohttp.ClientTimeout] = None, until=None, policy_name: Optional[str] = None) -> FetchResult:
+        """
+        所有上游请求的统一入口。相同请求（URL、参数及条件请求头）并发时只发出一次，结果共享；
+        实际请求按目标站点的策略限速、限制并发，并对 429/5xx/超时自动退避重试。
+        指定 until 时只读取到标记全部出现为止（见 net.fetch）。
+        近期返回 404 或挑战页的请求记录在负缓存中，有效期内直接抛出同样的错误。
+        policy_name 指定使用的站点策略，默认按域名选择；来源熔断与负缓存都跟随所用的策略。
+        """
+        if not self.stream_prefix_enabled:
+            until = None
+        conditional = tuple((name, headers[name]) for name in ("If-None-Match", "If-Modified-Since") if headers and name in headers)
+        key = (url, tuple(sorted((params or {}).items())), conditional, until)
+        policy = self._host_policies[policy_name] if policy_name else self._host_policy(url)
+        source = self._source_label(urlparse(url).hostname or "")
+        negative = self.negative_caches.get(policy.name)
+        negative_key = key[:2]
+        if negative is not None:
+            error = negative.get(negative_key)
+            if error is not None:
+                self.metrics.observe("fetch", source, "negative_cache", 0.0)
+                raise self._replay_error(error)
+
+        async def request() -> FetchResult:
+            started = time.perf_counter()
+            try:
+                result = await self._observe(policy.name, lambda: policy.run(
+                    lambda: fetch(session, url, params=params, headers=headers, timeout=timeout, until=until)
+                ))
+            except Exception as e:
+                self.metrics.observe("fetch", source, self._fetch_outcome(e), time.perf_counter() - started)
+                if negative is not None:
+                    self._remember_error(negative, negative_key, e)
+                raise
+            outcome = "not_modified" if result.not_modified else "ok"
+            self.metrics.observe("ttfb", source, outcome, result.ttfb)
+            self.metrics.observe("body", source, outcome, result.body_seconds)
+            self.metrics.observe("fetch", source, outcome, time.perf_counter() - started)
+            if until:
+                self._record_stream_result(result)
+            return result
+        return await self._single_flight.do(key, request)
+
+    def _remember_error(self, negative: TTLCache, key: tuple, error: BaseException):
+        """
+        把 404 与挑战页记入负缓存，其他错误（超时、5xx 等）多为暂时性故障，不记录。
+        """
+        if isinstance(error, ChallengePageError):
+            ttl = self.negative_challenge_ttl
+        elif isinstance(error, aiohttp.ClientResponseError) and error.status == 404:
+            ttl = self.negative_cache_ttl
+        else:
+            return
+        if ttl > 0:
+            negative.set(key, self._replay_error(error), ttl=ttl)
+
+    @staticmethod
+    def _replay_error(error: BaseException) -> BaseException:
+        """
+        复制一份不带调用栈的错误，负缓存命中时抛出，避免反复抛出同一对象使调用栈不断累积。
+        """
+        if isinstance(error, ChallengePageError):
+            return ChallengePageError(error.url, error.status)
+        return aiohttp.ClientResponseError(error.request_info, error.history, status=error.status, message=error.message, headers=error.headers)
+
+    def _record_stream_result(self, result: FetchResult):
+        self.stream_stats["bytes_read"] += len(result.body)
+        if not result.truncated:
+            return
+        self.stream_stats["early_closes"] += 1
+        if result.bytes_unconsumed is not None:
+            self.stream_stats["bytes_unconsumed"] += result.bytes_unconsumed
+            unconsumed = f"未读取 {result.bytes_unconsumed} 字节"
+        else:
+            unconsumed = "响应未给出长度（分块传输），未读取的字节数未知"
+        logger.info(f"流式读取 {result.url}: 读取 {len(result.body)} 字节（解压后）后提前断开，{unconsumed}（累计未读取 {self.stream_stats['bytes_unconsumed']} 字节）")
+
+    async def _observe(self, source: str, request):
+        """
+        经过来源熔断器发出请求，并记录耗时与结果。404 视为来源正常；挑战页会立即触发熔断。
+        """
+        health = self._source_health.get(source)
+        if health is None:
+            return await request()
+        if not health.acquire():
+            raise SourceUnavailableError(source, health.retry_in)
+        started = time.monotonic()
+        try:
+            result = await request()
+        except asyncio.CancelledError:
+            health.release()
+            raise
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                health.record_success(time.monotonic() - started)
+            else:
+                self._record_source_failure(health, started, f"HTTP {e.status}")
+            raise
+        except ChallengePageError as e:
+            self._record_source_failure(health, started, str(e), challenge=True)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._record_source_failure(health, started, repr(e))
+            raise
+        except Exception as e:
+            # 其他异常（如解码失败）同样计为失败，并归还半开探测名额，避免来源一直停留在不可用状态
+            self._record_source_failure(health, started, repr(e))
+            raise
+        health.record_success(time.monotonic() - started)
+        return result
+
+    def _record_source_failure(self, health: SourceHealth, started: float, error: str, challenge: bool = False):
+        if health.record_failure(time.monotonic() - started, error, challenge=challenge):
+            logger.warning(f"⚠️ 来源 {health.name} 已熔断 {health.retry_in:.0f}s ({error})；{health.describe()}")
+
+    def _api_health(self, api: int) -> SourceHealth:
+        return self._source_health["ypshuo" if api == 1 else "youshu"]
+
+    def _pick_api(self) -> int:
+        """
+        优先使用 base_url 对应的来源，其熔断时改用另一来源；两者都不可用时抛出 SourceUnavailableError。
+        """
+        for api in (self.api, 3 - self.api):
+            if self._api_health(api).available():
+                if api != self.api:
+                    logger.info(f"来源 {self._api_health(self.api).name} 不可用，改用 {self._api_health(api).name}")
+                return api
+        health = self._api_health(self.api)
+        raise SourceUnavailableError(health.name, health.retry_in)
+
+    async def _cached_search(self, source: str, api: int, keyword: str, page: int, fetch_remote) -> Optional[tuple[List[Dict], int]]:
+        """
+        先查搜索结果缓存，未命中时调用 fetch_remote() 访问上游，并缓存非空结果；确认无结果的搜索记入该来源的负缓存。
+        fetch_remote() 应只在上游正常答复且没有结果时返回空列表，请求失败或接口报错时返回 None。
+        """
+        cache_key = (source, api, normalize_keyword(keyword), page)
+        cached, needs_refresh = self._cache_lookup(self.search_cache, cache_key)
+        if cached is not None:
+            logger.info(f"命中搜索缓存 [{source}] '{keyword}' (Page {page})，命中率 {self.search_cache.hit_rate:.0%}")
+            if needs_refresh:
+                self._refresh_in_background(("search",) + cache_key, lambda: self._refresh_search(source, api, cache_key, fetch_remote))
+            return cached
+        empty = self._search_negative_cache(source, api).get(cache_key)
+        if empty is not None:
+            logger.info(f"命中负缓存 [{source}] '{keyword}' (Page {page})，近期搜索无结果")
+            return empty
+        return await self._refresh_search(source, api, cache_key, fetch_remote)
+
+    async def _refresh_search(self, source: str, api: int, cache_key: tuple, fetch_remote) -> Optional[tuple[List[Dict], int]]:
+        search_info = await fetch_remote()
+        if search_info is not None and search_info[0]:
+            self.search_cache.set(cache_key, search_info)
+            await self._index_titles(source, api, search_info[0])
+        elif search_info is not None and self.negative_cache_ttl > 0:
+            self._search_negative_cache(source, api).set(cache_key, search_info)
+        return search_info
+
+    def _search_negative_cache(self, source: str, api: int) -> TTLCache:
+        if source == "hs":
+            return self.negative_caches["uaa"]
+        return self.negative_caches["ypshuo" if api == 1 else "youshu"]
+
+    async def _get_title_index(self) -> Optional[TitleIndex]:
+        """
+        懒加载本地书名索引。
+        """
+        if not self.title_index_enabled:
+            return None
+        if self._title_index is not None and self._title_index.loaded:
+            return self._title_index
+        async with self._title_index_lock:
+            if self._title_index is None:
+                self._title_index = TitleIndex(self.data_dir / "title_index.db", max_entries=self.title_index_max_entries)
+            if not self._title_index.loaded:
+                try:
+                    await asyncio.to_thread(self._title_index.load)
+                    logger.info(f"已加载本地书名索引，共 {len(self._title_index)} 条")
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"⚠️ 加载本地书名索引失败: {e}")
+                    self._title_index.loaded = True
+        return self._title_index
+
+    async def _index_titles(self, source: str, api: int, books: List[Dict]):
+        """
+        把搜索结果或详情页中的书名、作者收录进本地书名索引，并定期落盘。
+        """
+        index = await self._get_title_index()
+        if index is None:
+            return
+        for book in books:
+            if source == "hs":
+                index.add(source, api, book.get('id'), book.get('title'), book.get('authors'))
+            else:
+                index.add(source, api, book.get('id'), book.get('novel_name'), book.get('author_name'))
+        if index.should_flush:
+            try:
+                await asyncio.to_thread(index.flush)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ 保存本地书名索引失败: {e}")
+
+    async def _lookup_title_index(self, keyword: str, apis: tuple) -> Optional[tuple[int, str]]:
+        """
+        在本地书名索引中查找与关键词高置信度匹配的唯一书籍，返回 (api, 书籍ID)。
+        """
+        index = await self._get_title_index()
+        if index is None:
+            return None
+        self.title_index_stats["lookups"] += 1
+        match = await asyncio.to_thread(index.best_match, "ys", keyword, self.title_index_min_score, apis=apis)
+        if match is None:
+            return None
+        self.title_index_stats["hits"] += 1
+        score, (_, api, novel_id), entry = match
+        logger.info(f"本地书名索引命中 '{keyword}' -> 【{entry['title']}】{entry['author']} (api {api}, ID {novel_id}, 得分 {score:.2f})")
+        return api, novel_id
+
+    def _apply_cursor_args(self, command: str, event: AstrMessageEvent, args: List[str]) -> List[str]:
+        """
+        只给出序号或 -页码 时，补上本会话上次查询的书名。序号或页码超出上次结果的范围、或没有记录时原样返回，
+        按书名搜索（如 `/ys 1984`）。
+        """
+        if len(args) != 1:
+            return args
+        arg = args[0]
+        if not (arg.isdigit() or (arg.startswith('-') and arg[1:].isdigit())):
+            return args
+        cursor = self.result_cursors.get((command, event.unified_msg_origin))
+        if cursor is None:
+            return args
+        number = int(arg.lstrip('-'))
+        if arg.startswith('-'):
+            in_range = 1 <= number <= cursor["total_pages"]
+        else:
+            in_range = 1 <= number <= self._cursor_item_count(cursor)
+        return [cursor["keyword"], arg] if in_range else args
+
+    @staticmethod
+    def _cursor_item_count(cursor: Dict) -> int:
+        """
+        上次结果的总条数：展示的是最后一页时可精确算出，否则按每页条数估算。
+        """
+        if cursor["page"] >= cursor["total_pages"]:
+            return cursor["start"] - 1 + len(cursor["books"])
+        return cursor["total_pages"] * cursor["per_page"]
+
+    def _save_cursor(self, command: str, event: AstrMessageEvent, keyword: str, page: int, start: int, per_page: int, total_pages: int, results: List[Dict], api: Optional[int] = None):
+        """
+        记录本会话展示的结果页；start 为本页第一条的序号（合并搜索去重后各页条数不固定，不能由页码推算）。
+        """
+        self.result_cursors.set((command, event.unified_msg_origin), {
+            "keyword": keyword,
+            "page": page,
+            "start": start,
+            "per_page": per_page,
+            "total_pages": max(page, total_pages),
+            "books": [(str(book.get('id', '')), book.get('api', api)) for book in results],
+        })
+
+    def _cursor_book(self, command: str, event: AstrMessageEvent, keyword: str, item_index: int) -> Optional[tuple[str, Optional[int]]]:
+        """
+        序号落在本会话上次展示的那一页内时，直接返回对应书籍的 (ID, API模式)，无需重新搜索。
+        """
+        cursor = self.result_cursors.get((command, event.unified_msg_origin))
+        if cursor is None or normalize_keyword(cursor["keyword"]) != normalize_keyword(keyword):
+            return None
+        offset = item_index - cursor["start"]
+        if not 0 <= offset < len(cursor["books"]):
+            return None
+        novel_id, api = cursor["books"][offset]
+        return (novel_id, api) if novel_id else None
 
-        self.YS_PLATFORMS = {"他站", "本站", "起点", "晋江", "番茄", "刺猬猫", "纵横", "飞卢", "17K", "有毒", "息壤", "铁血", "逐浪", "掌阅", "塔读", "独阅读", "少年梦", "SF", "豆瓣", "知乎", "公众号"}
-        self.YS_CATEGORIES = {"玄幻", "奇幻", "武侠", "仙侠", "都市", "现实", "军事", "历史", "悬疑", "游戏", "竞技", "科幻", "灵异", "二次元", "同人", "其他", "穿越时空", "架空历史", "总裁豪门", "都市言情", "仙侠奇缘", "幻想言情", "悬疑推理", "耽美纯爱", "衍生同人", "轻小说", "综合其他"}
-        self.YS_STATUSES = {"连载中", "已完结", "已太监"}
-        
     async def _perform_hs_search(self, session: aiohttp.ClientSession, keyword: str, page: int = 1) -> Optional[tuple[List[Dict], int]]:
+        return await self._cached_search("hs", 0, keyword, page, lambda: self._hs_search_remote(session, keyword, page))
+
+    async def _hs_search_remote(self, session: aiohttp.ClientSession, keyword: str, page: int = 1) -> Optional[tuple[List[Dict], int]]:
         """
         通过API搜索hs网站 (uaa.com) 的书籍。
         """
@@ -73,9 +816,8 @@ class YoushuSearchPlugin(Star):
             "orderType": 0
         }
         try:
-            async with session.get(search_api_url, params=params, headers=self.hs_headers, timeout=20) as response:
-                response.raise_for_status()
-                json_data = await response.json()
+            result = await self._fetch(session, search_api_url, params=params, headers=self.hs_headers, timeout=self._client_timeout(self.search_timeout))
+            json_data = result.json()
 
             if json_data.get("result") == "success" and "model" in json_data:
                 model = json_data["model"]
@@ -84,101 +826,99 @@ class YoushuSearchPlugin(Star):
                 logger.info(f"✅ HS API 搜索 '{keyword}' (Page {page}) 成功，找到 {len(results)} 条结果，共 {total_pages} 页。")
                 return results, total_pages
             else:
+                # 限流或接口错误不是"无结果"，返回 None 以免被记入负缓存
                 logger.warning(f"⚠️ HS API 搜索 '{keyword}' 返回失败或格式错误: {json_data.get('msg', '无信息')}")
-                return [], 0
+                return None
+        except (SourceUnavailableError, ChallengePageError):
+            raise
         except Exception as e:
             logger.error(f"❌ 执行 HS API 搜索时发生错误: {e}", exc_info=True)
             return None
 
-    async def _get_and_format_hs_details(self, event: AstrMessageEvent, session: aiohttp.ClientSession, novel_id: str):
+    async def _parse_hs_intro(self, result: FetchResult) -> Dict:
+        """
+        解析 hs (uaa.com) 的 /novel/intro 详情页。
+        """
+        return await self._parse_in_worker("hs", parse_hs_intro, result)
+
+    async def _fetch_hs_info(self, session: aiohttp.ClientSession, novel_id: str) -> Dict:
         """
-        获取、解析并格式化 hs (uaa.com) 的书籍详情。
+        获取 hs 书籍简介页的解析结果，带缓存与 ETag/Last-Modified 条件请求重新验证。
         """
         novel_url = urljoin(self.uaa_base_url, f"/novel/intro?id={novel_id}")
-        
+        return await self._fetch_detail_cached(
+            session, ("hs", str(novel_id)), novel_url, self.hs_headers, self._parse_hs_intro,
+            is_valid=lambda info: info.get('title', '无') != '无',
+        )
+
+    async def _fetch_hs_reviews(self, session: aiohttp.ClientSession, novel_id: str) -> List[Dict]:
+        reviews = []
         try:
-            async with session.get(novel_url, headers=self.hs_headers, timeout=10) as response:
-                response.raise_for_status()
-                html_content = await response.text()
-
-            novel_info = {}
-            def clean_text(text):
-                return text.strip() if text else '无'
-
-            title_match = re.search(r'<h1>(.*?)</h1>', html_content)
-            novel_info['title'] = clean_text(title_match.group(1)) if title_match else '无'
-            
-            author_match = re.search(r'作者：\s*<a.*?>(.*?)</a>', html_content)
-            novel_info['author'] = clean_text(author_match.group(1)) if author_match else '无'
-
-            status_match = re.search(r'<span class="update_state">状态：(.*?)</span>', html_content)
-            novel_info['status'] = clean_text(status_match.group(1)) if status_match else '无'
-
-            score_match = re.search(r'评分：<span>(.*?)</span>', html_content)
-            novel_info['score'] = clean_text(score_match.group(1)) if score_match else '无'
-            
-            intro_match = re.search(r'<div class="txt ellipsis">小说简介：(.*?)(?:</div>|<div class="arrow")', html_content, re.DOTALL)
-            novel_info['intro'] = clean_text(intro_match.group(1)) if intro_match else '无'
-            
-            tags = re.findall(r'<li><a href="/novel/list\?tag=.*?"><b>#</b>(.*?)</a></li>', html_content)
-            novel_info['tags'] = tags if tags else []
-
-            category_block_match = re.search(r'<div class="item">\s*题材：\s*(.*?)</div>', html_content, re.DOTALL)
-            if category_block_match:
-                categories = re.findall(r'<a.*?>(.*?)</a>', category_block_match.group(1))
-                novel_info['categories'] = [cat.strip() for cat in categories]
-            else:
-                novel_info['categories'] = []
-            
-            update_match = re.search(r'<div class="item">\s*最新：(.*?)\s*</div>', html_content)
-            novel_info['latest_update'] = clean_text(update_match.group(1)) if update_match else '无'
+            comments_url = urljoin(self.uaa_base_url, "/api/novel/app/novel/comments")
+            params = {"novelId": novel_id, "sortType": 1, "page": 1, "rows": 5}
+            result = await asyncio.wait_for(
+                self._fetch(session, comments_url, params=params, headers=self.hs_headers, timeout=self._client_timeout(self.detail_timeout)),
+                self.review_timeout,
+            )
+            comments_data = result.json()
+
+            if comments_data.get("result") == "success" and "data" in comments_data:
+                for item in comments_data["data"]:
+                    score_data = item.get('score')
+                    score_val = '无'
+                    if isinstance(score_data, dict):
+                        score_val = score_data.get('source', '无')
+                    elif isinstance(score_data, (int, float)):
+                        score_val = f"{score_data:.1f}"
+
+                    reviews.append({
+                        'author': item.get('nickName', '匿名'),
+                        'content': item.get('content', ''),
+                        'score': score_val,
+                        'time': item.get('createTimeFormat', '')
+                    })
+                logger.info(f"✅ 成功获取到 {len(reviews)} 条书评 for ID {novel_id}")
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ 获取书评超过 {self.review_timeout:g}s for ID {novel_id}，跳过书评")
+        except Exception as e:
+            logger.warning(f"⚠️ 获取书评失败 for ID {novel_id} (可能需要登录或接口失效): {e}")
+        return reviews
 
-            reviews = []
+    def _format_hs_details(self, novel_info: Dict, reviews: List[Dict]) -> str:
+        message_text = f"---【{novel_info['title']}】---\n"
+        message_text += f"作者: {novel_info['author']}\n"
+        message_text += f"评分: {novel_info['score']}\n"
+        message_text += f"状态: {novel_info['status']}\n"
+        
+        if novel_info['categories']:
+            message_text += f"题材: {' '.join(novel_info['categories'])}\n"
+        
+        if novel_info['tags']:
+            message_text += f"标签: {' '.join(novel_info['tags'])}\n"
+        
+        message_text += f"更新: {novel_info['latest_update']}\n"
+        message_text += f"简介: {novel_info['intro']}\n"
+
+        if reviews:
+            message_text += "\n--- 📝 最新书评 ---\n"
+            for r in reviews:
+                message_text += f"{r['author']} ({r['score']}分, {r['time']}): {r['content']}\n"
+        return message_text
+
+    async def _get_and_format_hs_details(self, event: AstrMessageEvent, session: aiohttp.ClientSession, novel_id: str):
+        """
+        获取、解析并格式化 hs (uaa.com) 的书籍详情。简介页与书评接口互不依赖，同时请求。
+        """
+        reviews_task = asyncio.create_task(self._fetch_hs_reviews(session, novel_id))
+        try:
             try:
-                comments_url = urljoin(self.uaa_base_url, "/api/novel/app/novel/comments")
-                params = {"novelId": novel_id, "sortType": 1, "page": 1, "rows": 5}
-                async with session.get(comments_url, params=params, headers=self.hs_headers, timeout=10) as response:
-                    response.raise_for_status()
-                    comments_data = await response.json()
-                    
-                    if comments_data.get("result") == "success" and "data" in comments_data:
-                        for item in comments_data["data"]:
-                            score_data = item.get('score')
-                            score_val = '无'
-                            if isinstance(score_data, dict):
-                                score_val = score_data.get('source', '无')
-                            elif isinstance(score_data, (int, float)):
-                                score_val = f"{score_data:.1f}"
-
-                            reviews.append({
-                                'author': item.get('nickName', '匿名'),
-                                'content': item.get('content', ''),
-                                'score': score_val,
-                                'time': item.get('createTimeFormat', '')
-                            })
-                        logger.info(f"✅ 成功获取到 {len(reviews)} 条书评 for ID {novel_id}")
-            except Exception as e:
-                logger.warning(f"⚠️ 获取书评失败 for ID {novel_id} (可能需要登录或接口失效): {e}")
-            
-            message_text = f"---【{novel_info['title']}】---\n"
-            message_text += f"作者: {novel_info['author']}\n"
-            message_text += f"评分: {novel_info['score']}\n"
-            message_text += f"状态: {novel_info['status']}\n"
-            
-            if novel_info['categories']:
-                message_text += f"题材: {' '.join(novel_info['categories'])}\n"
-            
-            if novel_info['tags']:
-                message_text += f"标签: {' '.join(novel_info['tags'])}\n"
-            
-            message_text += f"更新: {novel_info['latest_update']}\n"
-            message_text += f"简介: {novel_info['intro']}\n"
-
-            if reviews:
-                message_text += "\n--- 📝 最新书评 ---\n"
-                for r in reviews:
-                    message_text += f"{r['author']} ({r['score']}分, {r['time']}): {r['content']}\n"
-            
+                novel_info = await self._fetch_hs_info(session, novel_id)
+            except BaseException:
+                reviews_task.cancel()
+                raise
+            reviews = await reviews_task
+            with self.metrics.timer("build", "hs"):
+                message_text = self._format_hs_details(novel_info, reviews)
             yield event.plain_result(message_text)
 
         except Exception as e:
@@ -187,6 +927,10 @@ class YoushuSearchPlugin(Star):
 
     @filter.command("hs")
     async def hs_search_command(self, event: AstrMessageEvent):
+        async for result in self._timed_command("hs", self._hs_search(event)):
+            yield result
+
+    async def _hs_search(self, event: AstrMessageEvent):
         command_text = event.message_str.strip()
         command_parts = command_text.split()
         
@@ -194,7 +938,7 @@ class YoushuSearchPlugin(Star):
             yield event.plain_result("❌ 用法: /hs <书名> [序号 | -页码]")
             return
 
-        args = command_parts[1:]
+        args = self._apply_cursor_args("hs", event, command_parts[1:])
         book_name, page_to_list, item_index = "", 1, None
         last_arg = args[-1] if args else ""
         if len(args) > 1 and last_arg.startswith('-') and last_arg[1:].isdigit():
@@ -212,23 +956,31 @@ class YoushuSearchPlugin(Star):
             return
 
         logger.info(f"用户 {event.get_sender_id()} 触发 /hs, 搜索:'{book_name}', 序号:{item_index}, 列表页:{page_to_list}")
+        self._cancel_stale_prefetch(event, ("hs", normalize_keyword(book_name)))
 
         try:
-            async with aiohttp.ClientSession() as session:
-                page_to_fetch = page_to_list
-                search_info = await self._perform_hs_search(session, book_name, page=page_to_fetch)
+            session = await self._get_session()
+            cursor_book = self._cursor_book("hs", event, book_name, item_index) if item_index is not None else None
+            if cursor_book is not None:
+                logger.info(f"序号【{item_index}】命中会话结果列表，直接获取 hs 书籍 {cursor_book[0]}")
+                async for result in self._get_and_format_hs_details(event, session, cursor_book[0]):
+                    yield result
+                return
+            page_to_fetch = page_to_list
+            search_info = await self._perform_hs_search(session, book_name, page=page_to_fetch)
 
-                if search_info is None or not search_info[0]:
-                    yield event.plain_result(f"😢 未找到关于【{book_name}】的任何书籍信息。")
-                    return
+            if search_info is None or not search_info[0]:
+                yield event.plain_result(f"😢 未找到关于【{book_name}】的任何书籍信息。")
+                return
                 
-                search_results, max_pages = search_info
+            search_results, max_pages = search_info
 
-                if page_to_fetch > max_pages and max_pages > 0:
-                    yield event.plain_result(f"❌ 您请求的第 {page_to_fetch} 页不存在，【{book_name}】的搜索结果最多只有 {max_pages} 页。")
-                    return
+            if page_to_fetch > max_pages and max_pages > 0:
+                yield event.plain_result(f"❌ 您请求的第 {page_to_fetch} 页不存在，【{book_name}】的搜索结果最多只有 {max_pages} 页。")
+                return
 
-                if item_index is None: # 显示列表
+            if item_index is None: # 显示列表
+                with self.metrics.timer("build", "hs"):
                     results_per_page = 20
                     start_num = (page_to_fetch - 1) * results_per_page + 1
                     message_text = f"以下是【{book_name}】的第 {page_to_fetch}/{max_pages} 页搜索结果:\n"
@@ -248,370 +1000,408 @@ class YoushuSearchPlugin(Star):
                     message_text += f"\n💡 请使用 `/hs {book_name} <序号>` 查看详情"
                     if page_to_fetch < max_pages:
                         message_text += f"，或 `/hs {book_name} -{page_to_fetch + 1}` 翻页。"
-                    yield event.plain_result(message_text)
-                else: # 显示详情
-                    results_per_page = 20
-                    index_on_page = (item_index - 1) % results_per_page
-                    correct_page = (item_index - 1) // results_per_page + 1
-
-                    if correct_page != page_to_fetch:
-                        yield event.plain_result(f"⏳ 序号【{item_index}】位于第 {correct_page} 页，正在为您跳转...")
-                        page_to_fetch = correct_page
-                        search_info = await self._perform_hs_search(session, book_name, page=page_to_fetch)
-                        if search_info is None or not search_info[0]:
-                            yield event.plain_result(f"😢 未在第 {correct_page} 页找到关于【{book_name}】的信息。")
-                            return
-                        search_results, _ = search_info
-                    
-                    if not (0 <= index_on_page < len(search_results)):
-                        yield event.plain_result(f"❌ 序号【{item_index}】在第 {page_to_fetch} 页上不存在。")
-                        return
+                yield event.plain_result(message_text)
+                self._save_cursor("hs", event, book_name, page_to_fetch, start_num, results_per_page, max_pages, search_results)
+                self._schedule_prefetch(event, ("hs", normalize_keyword(book_name)), book_name, page_to_fetch, max_pages, search_results)
+            else: # 显示详情
+                results_per_page = 20
+                index_on_page = (item_index - 1) % results_per_page
+                correct_page = (item_index - 1) // results_per_page + 1
 
-                    selected_book = search_results[index_on_page]
-                    novel_id = selected_book.get('id')
-                    if not novel_id:
-                        yield event.plain_result(f"❌ 无法获取序号为【{item_index}】的书籍ID。")
+                if correct_page != page_to_fetch:
+                    yield event.plain_result(f"⏳ 序号【{item_index}】位于第 {correct_page} 页，正在为您跳转...")
+                    page_to_fetch = correct_page
+                    search_info = await self._perform_hs_search(session, book_name, page=page_to_fetch)
+                    if search_info is None or not search_info[0]:
+                        yield event.plain_result(f"😢 未在第 {correct_page} 页找到关于【{book_name}】的信息。")
                         return
+                    search_results, _ = search_info
+                    
+                if not (0 <= index_on_page < len(search_results)):
+                    yield event.plain_result(f"❌ 序号【{item_index}】在第 {page_to_fetch} 页上不存在。")
+                    return
+
+                self._save_cursor("hs", event, book_name, page_to_fetch, (page_to_fetch - 1) * results_per_page + 1, results_per_page, max_pages, search_results)
+                selected_book = search_results[index_on_page]
+                novel_id = selected_book.get('id')
+                if not novel_id:
+                    yield event.plain_result(f"❌ 无法获取序号为【{item_index}】的书籍ID。")
+                    return
 
-                    async for result in self._get_and_format_hs_details(event, session, str(novel_id)):
-                        yield result
+                async for result in self._get_and_format_hs_details(event, session, str(novel_id)):
+                    yield result
+        except (SourceUnavailableError, ChallengePageError) as e:
+            logger.warning(f"搜索hs书籍 '{book_name}' 失败: {e}")
+            yield event.plain_result(f"❌ 书籍来源暂时不可用，请稍后再试。({e})")
         except Exception as e:
             logger.error(f"搜索hs书籍 '{book_name}' 失败: {e}", exc_info=True)
             yield event.plain_result(f"❌ 搜索hs书籍时发生未知错误: {str(e)}")
 
-    async def _perform_search(self, session: aiohttp.ClientSession, keyword: str, page: int = 1) -> Optional[tuple[List[Dict], int]]:
-        if self.api == 1:
-            search_api_url = urljoin(self.base_api_url, self.search_api_endpoint)
+    async def _perform_search(self, session: aiohttp.ClientSession, keyword: str, page: int = 1, api: Optional[int] = None) -> Optional[tuple[List[Dict], int]]:
+        api = api or self.api
+        return await self._cached_search("ys", api, keyword, page, lambda: self._search_remote(session, keyword, page, api))
+
+    async def _perform_merged_search(self, session: aiohttp.ClientSession, keyword: str, page: int = 1, seen: Optional[set] = None, timeout: Optional[float] = None) -> Optional[tuple[List[Dict], int]]:
+        """
+        同时搜索两个来源的第 page 页，在 timeout（默认 both_search_deadline）秒内返回已到达的结果并取消仍未完成的来源。
+        结果按 base_url 对应的来源优先排列，按归一化的书名+作者去重，每条结果带上所属来源的 api 标记。
+        传入 seen 时同时跳过其中已有的书籍，并把本页新出现的书籍加入 seen。
+        """
+        apis = [self.api, 3 - self.api]
+        tasks = {api: asyncio.create_task(self._perform_search(session, keyword, page, api)) for api in apis}
+        timeout = self.both_search_deadline if timeout is None else max(0.0, timeout)
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            late = [api for api, task in tasks.items() if task in pending]
+            logger.warning(f"合并搜索 '{keyword}' (Page {page}) 超过 {timeout:.1f}s，已取消来源 {late}")
+
+        merged: List[Dict] = []
+        seen = set() if seen is None else seen
+        max_pages = 0
+        answered = False
+        for api in apis:
+            task = tasks[api]
+            if task not in done or task.exception() is not None or task.result() is None:
+                continue
+            results, total_pages = task.result()
+            answered = True
+            max_pages = max(max_pages, total_pages)
+            for book in results:
+                key = (
+                    normalize_keyword(str(book.get('novel_name', ''))).replace(" ", ""),
+                    normalize_keyword(str(book.get('author_name', ''))).replace(" ", ""),
+                )
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append({**book, 'api': api})
+        if not answered:
+            if not any(self._api_health(api).available() for api in apis):
+                health = self._api_health(self.api)
+                raise SourceUnavailableError(health.name, health.retry_in)
+            return None
+        return merged, max_pages
+
+    async def _merged_search_page(self, session: aiohttp.ClientSession, keyword: str, page: int = 1, item_index: Optional[int] = None) -> Optional[tuple[List[Dict], int, int, int]]:
+        """
+        合并搜索的第 page 页，返回 (本页结果, 总页数, 页码, 本页第一条的序号)。
+        两个来源的同一页合并后可能有重复，第 N 页是依次合并两个来源第 1~N 页、并与前面各页去重后新出现的书籍，
+        序号在各页之间连续，同一本书不会在后面的页中重复出现。前面各页的搜索结果通常已在缓存中。
+        指定 item_index 时忽略 page，返回包含该序号的那一页；序号超出全部结果时返回最后一页。
+        逐页合并共用一个 both_search_deadline 总时限，时限用完时停在已取得的最后一页，返回的页码可能小于目标页。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.both_search_deadline
+        seen: set = set()
+        start_num = 1
+        current = 1
+        previous: Optional[tuple[List[Dict], int, int, int]] = None
+        while True:
+            remaining = deadline - loop.time()
+            if previous is not None and remaining <= 0:
+                logger.warning(f"合并搜索 '{keyword}' 逐页合并超过 {self.both_search_deadline}s，停在第 {previous[2]} 页")
+                return previous
+            search_info = await self._perform_merged_search(session, keyword, page=current, seen=seen, timeout=remaining)
+            if search_info is None:
+                return previous
+            results, max_pages = search_info
+            if item_index is None:
+                found = current >= page
+            else:
+                found = start_num + len(results) > item_index
+            if found or current >= max_pages:
+                return results, max_pages, current, start_num
+            previous = results, max_pages, current, start_num
+            start_num += len(results)
+            current += 1
+
+    async def _search_remote(self, session: aiohttp.ClientSession, keyword: str, page: int = 1, api: Optional[int] = None) -> Optional[tuple[List[Dict], int]]:
+        api = api or self.api
+        if api == 1:
+            search_api_url = urljoin(self.api_base_urls[1], self.search_api_endpoint)
             params = {"keyword": keyword, "page": str(page)}
             try:
-                async with session.get(search_api_url, params=params, headers=self.headers, timeout=20) as response:
-                    response.raise_for_status()
-                    json_content = await response.json()
-                    logger.info(f"搜索 '{keyword}' (Page {page}) API调用成功。")
-                    if json_content.get("code") == "00" and "data" in json_content:
-                        data = json_content["data"]
-                        results = data.get("data", []) 
-                        total_pages = int(data.get("pageAll", 1))
-                        return results, total_pages
-                    else:
-                        return None
+                result = await self._fetch(session, search_api_url, params=params, headers=self.api_headers[1], timeout=self._client_timeout(self.search_timeout))
+                json_content = result.json()
+                logger.info(f"搜索 '{keyword}' (Page {page}) API调用成功。")
+                if json_content.get("code") == "00" and "data" in json_content:
+                    data = json_content["data"]
+                    results = data.get("data", []) 
+                    total_pages = int(data.get("pageAll", 1))
+                    return results, total_pages
+                else:
+                    return None
+            except SourceUnavailableError:
+                raise
+            except ChallengePageError as e:
+                logger.warning(f"❌ 执行API搜索失败: {e}")
+                return None
             except Exception as e:
                 logger.error(f"❌ 执行API搜索时发生错误: {e}", exc_info=True)
                 return None
 
-        elif self.api == 2:
+        elif api == 2:
             try:
-                results_per_page = 20
                 encoded_keyword = quote(keyword)
-                search_url = urljoin(self.base_api_url, f"/search/all/{encoded_keyword}/{page}.html")
+                search_url = urljoin(self.api_base_urls[2], f"/search/all/{encoded_keyword}/{page}.html")
                 logger.info(f"正在访问搜索URL: {search_url}")
 
-                async with session.get(search_url, headers=self.headers, timeout=20) as response:
-                    response.raise_for_status()
-                    body = await response.read()
-                    encoding = response.charset or 'utf-8'
-                    html_content = body.decode(encoding, errors='replace') 
-                
-                def clean_html(raw_html):
-                    return re.sub(r'<[^>]+>', '', raw_html).strip()
-
-                if '共有<b class="hot">' in html_content:
-                    logger.info("检测到搜索结果列表页，按列表解析。")
-                    total_results = 0
-                    total_match = re.search(r'共有<b class="hot">\s*(\d+)\s*</b>条结果', html_content)
-                    if total_match:
-                        total_results = int(total_match.group(1))
-                    
-                    total_pages = (total_results + results_per_page - 1) // results_per_page if total_results > 0 else 1
-                    
-                    results = []
-                    result_blocks = re.findall(r'<div class="c_row">.*?<div class="cb"></div>', html_content, re.DOTALL)
-                    
-                    for block in result_blocks:
-                        book_info = {}
-                        name_match = re.search(r'<span class="c_subject"><a href="/book/(\d+)">(.*?)</a></span>', block, re.DOTALL)
-                        if name_match:
-                            book_info['id'] = int(name_match.group(1))
-                            book_info['novel_name'] = clean_html(name_match.group(2))
-                        
-                        author_match = re.search(r'<span class="c_label">作者：</span><span class="c_value">(.*?)</span>', block, re.DOTALL)
-                        if author_match:
-                            book_info['author_name'] = clean_html(author_match.group(1))
-                        
-                        score_match = re.search(r'<span class="c_rr">([\d.]+)</span>', block)
-                        if score_match:
-                            book_info['score'] = score_match.group(1)
-                        
-                        scorer_match = re.search(r'<span class="stard">\((\d+)人评分\)</span>', block)
-                        if scorer_match:
-                            book_info['scorer'] = scorer_match.group(1)
-                        
-                        if 'id' in book_info and 'novel_name' in book_info:
-                            results.append(book_info)
-                    
-                    logger.info(f"成功从列表页解析到 {len(results)} 条结果，共 {total_pages} 页。")
-                    return results, total_pages
+                result = await self._fetch(session, search_url, headers=self.api_headers[2], timeout=self._client_timeout(self.search_timeout))
+                results, total_pages = await self._parse_in_worker(str(api), parse_search_page, result, api)
+                if results:
+                    logger.info(f"成功从搜索页解析到 {len(results)} 条结果，共 {total_pages} 页。")
                 else:
-                    logger.info("未找到搜索列表，尝试按单本书籍详情页解析...")
-                    name_match = re.search(r'<title>(.*?)-.*?-优书网</title>', html_content)
-                    id_match = re.search(r"uservote\.php\?id=(\d+)|rating\('\d+',\s*'(\d+)'\)|addbookcase\.php\?bid=(\d+)", html_content)
-
-                    if name_match and id_match:
-                        novel_id_str = next((gid for gid in id_match.groups() if gid is not None), None)
-                        if novel_id_str:
-                            novel_name = clean_html(name_match.group(1))
-                            novel_id = int(novel_id_str)
-                            logger.info(f"搜索结果为直接跳转，解析到书籍: '{novel_name}' (ID: {novel_id})")
-                            
-                            results = [{'id': novel_id, 'novel_name': novel_name}]
-                            total_pages = 1
-                            return results, total_pages
-
                     logger.warning("页面既不是搜索列表也不是有效的书籍详情页，判定为无结果。")
-                    return [], 0
+                return results, total_pages
 
+            except SourceUnavailableError:
+                raise
+            except ChallengePageError as e:
+                logger.warning(f"❌ 执行搜索失败: {e}")
+                return None
             except Exception as e:
                 logger.error(f"❌ 执行搜索时发生错误: {e}", exc_info=True)
                 return None
         
-    async def _get_latest_novel_id(self, session: aiohttp.ClientSession) -> Optional[int]:
-        if self.api == 1:
-            url = "https://www.ypshuo.com/"
-            try:
-                async with session.get(url, headers=self.headers, timeout=10) as response:
-                    response.raise_for_status()
-                    html_content = await response.text()
-                    matches = re.findall(r'href="/novel/(\d+)\.html"', html_content)
-                    if matches:
-                        latest_id = max([int(id) for id in matches])
-                        return latest_id
-            except Exception:
-                return None
-        elif self.api == 2:
-            url = "https://youshu.me/"
-            try:
-                async with session.get(url, headers=self.headers, timeout=10) as response:
-                    response.raise_for_status()
-                    html_content = await response.text()
-                    new_book_section_match = re.search(
-                        r'<div class="blocktitle">新书自助推荐.*?</div>\s*<div class="blockcontent">.*?</ul>',
-                        html_content, re.DOTALL)
-                    if not new_book_section_match:
-                        return None
-                    new_book_block = new_book_section_match.group(0)
-                    matches = re.findall(r'href="/book/(\d+)"', new_book_block)
-                    if matches:
-                        latest_id = max([int(id) for id in matches])
-                        return latest_id
-                    else:
-                        return None
-            except Exception:
-                return None
+    async def _get_latest_novel_id(self, session: aiohttp.ClientSession, api: Optional[int] = None) -> Optional[int]:
+        api = api or self.api
+        cached, needs_refresh = self._cache_lookup(self.latest_id_cache, api)
+        if cached is not None:
+            if needs_refresh:
+                self._refresh_in_background(("latest_id", api), lambda: self._fetch_latest_novel_id(session, api))
+            return cached
+        return await self._fetch_latest_novel_id(session, api)
 
-    async def _get_novel_details_from_html(self, html_content: str, novel_id: str) -> Dict:
-        def clean_html_content(text):
-            if not text:
-                return '无'
-            text = re.sub(r'<[^>]+>', '', text)
-            text = re.sub(r'\s+', ' ', text).strip()
-            text = re.sub(r'\.{3,}全文$', '...', text).strip()
-            return text if text else '无'
-        
-        novel_info = {}
-        
-        if self.api == 1:
-            try:
-                og_image_match = re.search(r'<meta[^>]*?name="og:image"[^>]*?content="(.*?)"', html_content)
-                if og_image_match:
-                    image_url = og_image_match.group(1)
-                    if image_url.startswith('//'):
-                        image_url = 'https:' + image_url
-                    elif image_url.startswith('/'):
-                        image_url = urljoin(self.base_api_url, image_url)
-                    novel_info['image_url'] = image_url
-                else:
-                    image_match = re.search(r'<img src="(.*?)"[^>]*?class="book-img"', html_content)
-                    if image_match:
-                        image_url = image_match.group(1)
-                        if image_url.startswith('/'):
-                            image_url = urljoin(self.base_api_url, image_url)
-                        novel_info['image_url'] = image_url
-                    else:
-                        novel_info['image_url'] = None
-                name_match = re.search(r'<h1 class="book-name".*?>(.*?)</h1>', html_content, re.DOTALL)
-                novel_info['novel_name'] = name_match.group(1).strip() if name_match else '无'
-                author_match = re.search(r'作者：<span class="text-red-500".*?>(.*?)</span>', html_content)
-                novel_info['author_name'] = author_match.group(1).strip() if author_match else '无'
-                novel_info['tags'] = []
-                tag_block_match = re.search(r'<div class="tag-list"[^>]*?>(.*?)</div>', html_content, re.DOTALL)
-                if tag_block_match:
-                    tag_html = tag_block_match.group(1)
-                    tags_list = re.findall(r'<span[^>]*?>(.*?)</span>', tag_html)
-                    if tags_list:
-                        novel_info['tags'] = [tag.strip() for tag in tags_list if tag.strip()]
-                word_count_match = re.search(r'字数：(.*?)万字', html_content)
-                if word_count_match:
-                    try:
-                        word_str = word_count_match.group(1).strip().replace(',', '')
-                        novel_info['word_number'] = float(word_str) * 10000
-                    except (ValueError, TypeError):
-                        novel_info['word_number'] = None
-                else:
-                    novel_info['word_number'] = None
-                score_data_matches = re.findall(r'<div class="item"[^>]*?>\s*<p class="score"[^>]*?>\s*(.*?)\s*</p>\s*<p[^>]*?>(.*?)</p>\s*</div>', html_content, re.DOTALL)
-                novel_info['score'] = '无'
-                novel_info['scorer'] = '无'
-                for value, label in score_data_matches:
-                    if label.strip() == '评分':
-                        novel_info['score'] = value.strip()
-                    elif label.strip() == '评分人数':
-                        novel_info['scorer'] = value.strip()
-                status_match = re.search(r'状态：\s*(.*?)\s*<', html_content)
-                novel_info['status'] = status_match.group(1).strip() if status_match else '无'
-                update_time_match = re.search(r'更新时间：\s*(.*?)\s*</div>', html_content)
-                novel_info['update_time_str'] = update_time_match.group(1).strip() if update_time_match else '无'
-                reviews = []
-                review_item_regex = re.compile(
-                    r'<div class="author-info"[^>]*?>(.*?)</div>'r'.*?'r'aria-valuenow="([^"]+)"'r'.*?'r'<span class="content-inner-details"[^>]*?>(.*?)</span>', re.DOTALL)
-                all_reviews = review_item_regex.findall(html_content)
-                for author, rating, content_block in all_reviews[:3]: 
-                    content = re.sub(r'<[^>]+>', '', content_block)
-                    content = re.sub(r'[\r\n\t]+', '', content).strip()
-                    content = re.sub(r'\.{3,}全文$', '...', content).strip()
-                    if content:
-                        reviews.append({'author': author.strip(), 'content': content, 'rating': rating})
-                novel_info['reviews'] = reviews
-                synopsis_match = re.search(r'<div style="white-space:pre-wrap;"[^>]*?>(.*?)</div>', html_content, re.DOTALL)
-                synopsis_content = synopsis_match.group(1).strip() if synopsis_match else '无'
-                novel_info['synopsis'] = synopsis_content
-                link_match = re.search(r'<a href="(http.*?)".*?rel="nofollow".*?>', html_content)
-                novel_info['link'] = link_match.group(1).strip() if link_match else '无'
-                return novel_info
-            except Exception as e:
-                logger.error(f"❌ DOM解析失败。错误: {e}")
-                return {}
+    async def _fetch_latest_novel_id(self, session: aiohttp.ClientSession, api: int) -> Optional[int]:
+        url = "https://www.ypshuo.com/" if api == 1 else "https://youshu.me/"
+        try:
+            result = await self._fetch(session, url, headers=self.api_headers[api], timeout=self._client_timeout(self.detail_timeout), until=latest_id_until(api))
+            latest_id = await self._parse_in_worker(str(api), parse_latest_id, result, api)
+            if latest_id is None and result.truncated:
+                logger.warning(f"流式读取 {url} 的前缀未解析出最新ID，改为读取完整页面")
+                self.stream_stats["fallbacks"] += 1
+                result = await self._fetch(session, url, headers=self.api_headers[api], timeout=self._client_timeout(self.detail_timeout))
+                latest_id = await self._parse_in_worker(str(api), parse_latest_id, result, api)
+        except Exception:
+            return None
+        if latest_id:
+            self.latest_id_cache.set(api, latest_id)
+        return latest_id
 
-        elif self.api == 2:
-            try:
-                name_match = re.search(r'<title>(.*?)-.*?-优书网</title>', html_content)
-                novel_info['novel_name'] = clean_html_content(name_match.group(1)) if name_match else '无'
-                author_match = re.search(r'作者：<a.*?>(.*?)</a>', html_content)
-                novel_info['author_name'] = clean_html_content(author_match.group(1)) if author_match else '无'
-                score_match = re.search(r'<span class="ratenum">(.*?)</span>', html_content)
-                scorer_match = re.search(r'\((.*?)人已评\)', html_content)
-                novel_info['score'] = clean_html_content(score_match.group(1)) if score_match else '无'
-                novel_info['scorer'] = clean_html_content(scorer_match.group(1)) if scorer_match else '无'
-                update_time_match = re.search(r'最后更新：(.*?)</td>', html_content)
-                novel_info['update_time_str'] = clean_html_content(update_time_match.group(1)) if update_time_match else '无'
-                synopsis_match = re.search(r'<div class="tabvalue"[^>]*?>\s*<div[^>]*?>(.*?)</div>', html_content, re.DOTALL)
-                novel_info['synopsis'] = clean_html_content(synopsis_match.group(1)) if synopsis_match else '无'
-                link_match = re.search(r'<a class="btnlink b_hot mbs" href="(.*?)"', html_content)
-                novel_info['link'] = clean_html_content(link_match.group(1)) if link_match else '无'
-                img_match = re.search(r'<a[^>]*?class="book-detail-img"[^>]*?><img src="(.*?)"', html_content)
-                novel_info['image_url'] = urljoin(self.base_api_url, img_match.group(1).strip()) if img_match and img_match.group(1).strip() else None
-                novel_info.update({'platform': '无', 'category': '无', 'status': '无', 'word_number': None})
-                info_exp_match = re.search(r'<div class="author-item-exp">(.*?)</div>', html_content, re.DOTALL)
-                if info_exp_match:
-                    raw_text = info_exp_match.group(1).replace('<i class="author-item-line"></i>', '|')
-                    clean_text = re.sub(r'<[^>]+>', '', raw_text)
-                    info_parts = [part.strip() for part in clean_text.split('|') if part.strip()]
-                    for part in info_parts:
-                        if part in self.YS_PLATFORMS:
-                            novel_info['platform'] = part
-                        elif part in self.YS_CATEGORIES:
-                            novel_info['category'] = part
-                        elif part in self.YS_STATUSES:
-                            novel_info['status'] = part
-                        elif '字' in part:
-                            word_match = re.search(r'(\d+)', part)
-                            if word_match:
-                                novel_info['word_number'] = float(word_match.group(1))
-                novel_info['tags'] = []
-                tag_section_match = re.search(r'<b>标签：</b>(.*?)</div>', html_content, re.DOTALL)
-                if tag_section_match:
-                    tag_block = tag_section_match.group(1)
-                    tags = re.findall(r'<a[^>]*?>(.*?)</a>', tag_block)
-                    if tags:
-                        novel_info['tags'] = [clean_html_content(tag) for tag in tags]
-                reviews = []
-                review_blocks = re.findall(r'<div class="c_row cf">.*?<div class="c_tag">', html_content, re.DOTALL)
-                for block in review_blocks[:5]:
-                    author_match = re.search(r'<p>(.*?)</p></a>\s*<p><div class="user-level">', block, re.DOTALL)
-                    rating_match = re.search(r'<span title="(\d+)\s*颗星"', block, re.DOTALL)
-                    content_match = re.search(r'<div class="c_description">(.*?)</div>', block, re.DOTALL)
-                    if author_match and rating_match and content_match:
-                        author = clean_html_content(author_match.group(1))
-                        rating = rating_match.group(1)
-                        content = clean_html_content(content_match.group(1))
-                        if content and content != '无':
-                            reviews.append({'author': author, 'content': content, 'rating': rating})
-                novel_info['reviews'] = reviews
-                return novel_info
-            except Exception as e:
-                logger.error(f"❌ DOM解析 (youshu.me) 失败。错误: {e}")
-                return {}
-            
-    async def _get_and_format_novel_details(self, event: AstrMessageEvent, session: aiohttp.ClientSession, novel_id: str):
-        if self.api == 1:
-            novel_url = f"https://www.ypshuo.com/novel/{novel_id}.html"
+    async def _get_novel_details_from_html(self, result: FetchResult, api: Optional[int] = None) -> Dict:
+        api = api or self.api
+        try:
+            return await self._parse_in_worker(str(api), parse_novel_detail, result, api, self.api_base_urls[api])
+        except Exception as e:
+            source = "ypshuo.com" if api == 1 else "youshu.me"
+            logger.error(f"❌ DOM解析 ({source}) 失败。错误: {e}")
+            return {}
+
+    def _novel_url(self, novel_id: str, api: Optional[int] = None) -> str:
+        if (api or self.api) == 1:
+            return f"https://www.ypshuo.com/novel/{novel_id}.html"
+        return f"https://youshu.me/book/{novel_id}"
+
+    async def _fetch_detail_cached(self, session: aiohttp.ClientSession, cache_key: tuple, url: str, headers: Dict[str, str], parse, is_valid=bool, until=None, required=()) -> Dict:
+        """
+        获取详情页并交由 parse(FetchResult) 解析，结果按 cache_key 缓存。缓存过期后携带 ETag/Last-Modified 发起条件请求，
+        收到 304 时直接沿用已解析的结果，无需重新下载和解析。过期不久或即将过期的热门条目先返回缓存，再在后台重新验证。
+        流式读取的前缀解析不出 required 中的某个字段时，视为截断位置不可靠，重新读取完整页面，前缀的结果不会被缓存。
+        """
+        cached, needs_refresh = self._cache_lookup(self.detail_cache, cache_key)
+        if cached is not None:
+            logger.info(f"命中详情缓存 {cache_key}")
+            if needs_refresh:
+                self._refresh_in_background(("detail",) + cache_key, lambda: self._load_detail(session, cache_key, url, headers, parse, is_valid, until, required))
+            return cached["info"]
+        return await self._load_detail(session, cache_key, url, headers, parse, is_valid, until, required)
+
+    async def _load_detail(self, session: aiohttp.ClientSession, cache_key: tuple, url: str, headers: Dict[str, str], parse, is_valid=bool, until=None, required=()) -> Dict:
+        stale = self.detail_cache.get_stale(cache_key)
+        stale_entry = stale[0] if stale else None
+        request_headers = headers
+        if stale_entry and (stale_entry.get("etag") or stale_entry.get("last_modified")):
+            request_headers = conditional_headers(headers, stale_entry.get("etag"), stale_entry.get("last_modified"))
+        result = await self._fetch(session, url, headers=request_headers, timeout=self._client_timeout(self.detail_timeout), until=until)
+        if result.not_modified and stale_entry:
+            logger.info(f"详情页 {url} 未修改 (304)，沿用缓存结果。")
+            self.detail_cache.set(cache_key, stale_entry)
+            return stale_entry["info"]
+        novel_info = await parse(result)
+        missing = [field for field in required if novel_info.get(field) in (None, '', '无', [])] if result.truncated else []
+        if missing:
+            logger.warning(f"流式读取 {url} 的前缀缺少 {missing}，改为读取完整页面")
+            self.stream_stats["fallbacks"] += 1
+            result = await self._fetch(session, url, headers=headers, timeout=self._client_timeout(self.detail_timeout))
+            novel_info = await parse(result)
+        if is_valid(novel_info):
+            self.detail_cache.set(cache_key, {
+                "info": novel_info,
+                "etag": result.etag,
+                "last_modified": result.last_modified,
+            })
+        return novel_info
+
+    async def _fetch_novel_info(self, session: aiohttp.ClientSession, novel_id: str, api: Optional[int] = None) -> Dict:
+        """
+        获取书籍详情信息。页面无法解析出有效书名时抛出 ValueError。
+        """
+        api = api or self.api
+        try:
+            novel_info = await self._fetch_detail_cached(
+                session,
+                (api, str(novel_id)),
+                self._novel_url(novel_id, api),
+                self.api_headers[api],
+                lambda result: self._get_novel_details_from_html(result, api),
+                is_valid=lambda info: bool(info) and info.get('novel_name', '无') != '无',
+                until=detail_until(api),
+                required=detail_fields(api),
+            )
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                await self._record_novel_id(novel_id, valid=False, api=api)
+            raise
+        if not (novel_info and novel_info.get('novel_name', '无') != '无'):
+            raise ValueError(f"无法从页面 {novel_id} 提取有效信息。")
+        await self._record_novel_id(novel_id, valid=True, api=api)
+        await self._index_titles("ys", api, [{**novel_info, 'id': novel_id}])
+        return novel_info
+
+    def _format_novel_details(self, novel_info: Dict, novel_url: str, api: Optional[int] = None) -> str:
+        message_text = f"---【{novel_info.get('novel_name', '无')}】---\n"
+        message_text += f"作者: {novel_info.get('author_name', '无')}\n"
+        if (api or self.api) == 2:
+            message_text += f"平台: {novel_info.get('platform', '未知')}\n"
+            message_text += f"分类: {novel_info.get('category', '未知')}\n"
+        tags = novel_info.get('tags')
+        if tags:
+            message_text += f"标签: {' '.join(tags)}\n"
+        word_number = novel_info.get('word_number')
+        if word_number is not None and isinstance(word_number, (int, float)):
+            message_text += f"字数: {word_number / 10000:.2f}万字\n"
         else:
-            novel_url = f"https://youshu.me/book/{novel_id}"
+            message_text += f"字数: 无\n"
+        score = novel_info.get('score', '无')
+        scorer = novel_info.get('scorer', '无')
+        scorer_text = f"{scorer}人评分" if scorer and scorer != '无' else "无人评分"
+        message_text += f"评分: {score} ({scorer_text})\n"
+        message_text += f"状态: {novel_info.get('status', '无')}\n"
+        message_text += f"更新: {novel_info.get('update_time_str', '无')}\n"
+        synopsis = novel_info.get('synopsis', '无')
+        message_text += f"简介: {synopsis}\n"
+        message_text += f"链接: {novel_info.get('link', novel_url)}\n"
+        reviews = novel_info.get('reviews', [])
+        if reviews:
+            message_text += "\n--- 📝 最新书评 ---\n"
+            for review in reviews:
+                author = review.get('author', '匿名')
+                rating = review.get('rating', '无')
+                content = review.get('content', '无')
+                message_text += f"{author} ({rating}分): {content}\n"
+        return message_text
+
+    async def _download_cover(self, session: aiohttp.ClientSession, image_url: str) -> tuple[bytes, str]:
+        """
+        下载封面并按配置缩放、重新编码，返回 (图片字节, 来源标签)。
+        """
+        source = self._source_label(urlparse(image_url).hostname or "")
+        with self.metrics.timer("cover", source):
+            # 封面图床（如 img.ypshuo.com）走 default 策略，失败不会计入搜索/详情来源的熔断器
+            result = await self._fetch(session, image_url, timeout=self._client_timeout(self.detail_timeout), policy_name="default")
+        if not self.cover_variant:
+            return result.body, source
+        with self.metrics.timer("resize", source):
+            data = await self._run_in_worker(process_cover, result.body, self.cover_format, self.cover_max_dimension, self.cover_quality)
+        return data, source
+
+    async def _get_cover_base64(self, session: aiohttp.ClientSession, image_url: str) -> str:
+        """
+        获取封面的 base64 编码，优先读取磁盘缓存。
+        """
+        if self.cover_cache is not None:
+            cached = await asyncio.to_thread(self.cover_cache.get_base64, image_url, self.cover_variant)
+            if cached is not None:
+                logger.info(f"命中封面缓存: {image_url}")
+                return cached
+        data, source = await self._download_cover(session, image_url)
+        with self.metrics.timer("encode", source):
+            if self.cover_cache is not None:
+                try:
+                    return await asyncio.to_thread(self.cover_cache.put, image_url, data, self.cover_variant)
+                except OSError as e:
+                    logger.warning(f"⚠️ 写入封面缓存失败: {e}")
+            return await self._run_in_worker(encode_base64, data)
+
+    async def _get_cover_image(self, session: aiohttp.ClientSession, image_url: str, as_file: bool = False) -> Comp.Image:
+        """
+        获取封面消息组件。as_file 为 True 时发送缓存中的本地文件，文件无法写入缓存时退回 base64。
+        """
+        if as_file and self.cover_cache is not None:
+            path = await asyncio.to_thread(self.cover_cache.get_path, image_url, self.cover_variant)
+            if path is None:
+                data, source = await self._download_cover(session, image_url)
+                try:
+                    path = await asyncio.to_thread(self.cover_cache.store, image_url, data, self.cover_variant)
+                except OSError as e:
+                    logger.warning(f"⚠️ 写入封面缓存失败: {e}")
+                if path is None:
+                    with self.metrics.timer("encode", source):
+                        image_base64 = await self._run_in_worker(encode_base64, data)
+                    return Comp.Image(file=f"base64://{image_base64}")
+            return Comp.Image.fromFileSystem(str(path))
+        image_base64 = await self._get_cover_base64(session, image_url)
+        return Comp.Image(file=f"base64://{image_base64}")
+
+    def _cover_as_file(self, event: AstrMessageEvent) -> bool:
+        return self.cover_cache is not None and event.get_platform_name() in self.cover_file_platforms
+
+    async def _get_cover_within_deadline(self, session: aiohttp.ClientSession, image_url: str, as_file: bool = False) -> Optional[Comp.Image]:
+        """
+        在 cover_timeout 内获取封面消息组件，失败或超时返回 None，不影响文字详情的发送。
+        """
         try:
-            async with session.get(novel_url, headers=self.headers, timeout=10) as response:
-                response.raise_for_status()
-                html_content = await response.text()
-            novel_info = await self._get_novel_details_from_html(html_content, str(novel_id))
-            if not (novel_info and novel_info.get('novel_name', '无') != '无'):
-                raise ValueError(f"无法从页面 {novel_id} 提取有效信息。")
-            if novel_info and novel_info.get('novel_name', '无') != '无':
-                message_text = f"---【{novel_info.get('novel_name', '无')}】---\n"
-                message_text += f"作者: {novel_info.get('author_name', '无')}\n"
-                if self.api == 2:
-                    message_text += f"平台: {novel_info.get('platform', '未知')}\n"
-                    message_text += f"分类: {novel_info.get('category', '未知')}\n"
-                tags = novel_info.get('tags')
-                if tags:
-                    message_text += f"标签: {' '.join(tags)}\n"
-                word_number = novel_info.get('word_number')
-                if word_number is not None and isinstance(word_number, (int, float)):
-                    message_text += f"字数: {word_number / 10000:.2f}万字\n"
-                else:
-                    message_text += f"字数: 无\n"
-                score = novel_info.get('score', '无')
-                scorer = novel_info.get('scorer', '无')
-                scorer_text = f"{scorer}人评分" if scorer and scorer != '无' else "无人评分"
-                message_text += f"评分: {score} ({scorer_text})\n"
-                message_text += f"状态: {novel_info.get('status', '无')}\n"
-                message_text += f"更新: {novel_info.get('update_time_str', '无')}\n"
-                synopsis = novel_info.get('synopsis', '无')
-                message_text += f"简介: {synopsis}\n"
-                message_text += f"链接: {novel_info.get('link', novel_url)}\n"
-                reviews = novel_info.get('reviews', [])
-                if reviews:
-                    message_text += "\n--- 📝 最新书评 ---\n"
-                    for review in reviews:
-                        author = review.get('author', '匿名')
-                        rating = review.get('rating', '无')
-                        content = review.get('content', '无')
-                        message_text += f"{author} ({rating}分): {content}\n"
+            return await asyncio.wait_for(self._get_cover_image(session, image_url, as_file), self.cover_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"❌ 封面下载超过 {self.cover_timeout:g}s，跳过封面: {image_url}")
+        except Exception as e:
+            logger.warning(f"❌ 下载封面图片失败 (超时或链接无效): {e}")
+        return None
+
+    async def _get_and_format_novel_details(self, event: AstrMessageEvent, session: aiohttp.ClientSession, novel_id: str, api: Optional[int] = None):
+        api = api or self.api
+        novel_url = self._novel_url(novel_id, api)
+        try:
+            novel_info = await self._fetch_novel_info(session, novel_id, api)
+            # 拿到封面地址后立即开始下载，与文字详情的构建并行
+            cover_task = None
+            if novel_info.get('image_url'):
+                cover_task = asyncio.create_task(self._get_cover_within_deadline(session, novel_info['image_url'], self._cover_as_file(event)))
+            try:
+                with self.metrics.timer("build", str(api)):
+                    message_text = self._format_novel_details(novel_info, novel_url, api)
+                if cover_task is not None and self.cover_followup:
+                    # 先发送文字详情，封面在 cover_timeout 内到达时再单独补发一条，否则静默放弃
+                    yield event.plain_result(message_text)
+                    cover = await cover_task
+                    if cover is not None:
+                        yield event.chain_result([cover])
+                    return
                 chain = []
-                if novel_info.get('image_url'):
-                    image_url = novel_info['image_url']
-                    try:
-                        timeout = aiohttp.ClientTimeout(total=10)
-                        async with session.get(image_url, timeout=timeout) as img_response:
-                            img_response.raise_for_status()
-                            image_bytes = await img_response.read()
-                        image_base64 = base64.b64encode(image_bytes).decode()
-                        image_component = Comp.Image(file=f"base64://{image_base64}")
-                        chain.append(image_component)
-                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                        logger.warning(f"❌ 下载封面图片失败 (超时或链接无效): {e}")
+                if cover_task is not None:
+                    cover = await cover_task
+                    if cover is not None:
+                        chain.append(cover)
+                    else:
                         message_text = "🖼️ 封面加载失败\n\n" + message_text
-                chain.append(Comp.Plain(message_text))
-                yield event.chain_result(chain)
-            else:
-                yield event.plain_result(f"😢 无法从页面 {novel_id} 提取有效信息。")
+            finally:
+                if cover_task is not None and not cover_task.done():
+                    cover_task.cancel()
+            chain.append(Comp.Plain(message_text))
+            yield event.chain_result(chain)
         except aiohttp.ClientResponseError as e:
             logger.error(f"❌ 访问详情页 {novel_url} 失败，HTTP状态码: {e.status}")
             raise e
@@ -621,15 +1411,26 @@ class YoushuSearchPlugin(Star):
 
     @filter.command("ys")
     async def youshu_search_command(self, event: AstrMessageEvent):
+        async for result in self._timed_command("ys", self._youshu_search(event)):
+            yield result
+
+    async def _youshu_search(self, event: AstrMessageEvent):
         command_text = event.message_str.strip()
         command_parts = command_text.split()
         if not command_parts or command_parts[0].lower() != 'ys' or len(command_parts) < 2:
             yield event.plain_result("❌ 用法: /ys <书名> [序号 | -页码]")
             return
-        args = command_parts[1:]
+        titles = self._split_batch_titles(command_text[len(command_parts[0]):])
+        if len(titles) > 1:
+            async for result in self._youshu_batch_search(event, titles):
+                yield result
+            return
+        args = self._apply_cursor_args("ys", event, command_parts[1:])
         book_name, page_to_list, item_index = "", 1, None
+        list_requested = False
         last_arg = args[-1] if args else ""
         if len(args) > 1 and last_arg.startswith('-') and last_arg[1:].isdigit():
+            list_requested = True
             page_to_list = int(last_arg[1:])
             if page_to_list == 0: page_to_list = 1
             book_name = " ".join(args[:-1]).strip()
@@ -643,34 +1444,87 @@ class YoushuSearchPlugin(Star):
             yield event.plain_result("❌ 请提供有效的书名进行搜索。")
             return
         logger.info(f"用户 {event.get_sender_id()} 触发 /ys, 搜索:'{book_name}', 序号:{item_index}, 列表页:{page_to_list}")
+        self._cancel_stale_prefetch(event, ("ys", normalize_keyword(book_name)))
         try:
-            async with aiohttp.ClientSession() as session:
-                results_per_page = 20 if self.api == 2 else 15
+            session = await self._get_session()
+            cursor_book = self._cursor_book("ys", event, book_name, item_index) if item_index is not None else None
+            if cursor_book is not None:
+                novel_id, cursor_api = cursor_book
+                logger.info(f"序号【{item_index}】命中会话结果列表，直接获取书籍 {novel_id} (api {cursor_api})")
+                async for result in self._get_and_format_novel_details(event, session, novel_id, cursor_api):
+                    yield result
+                return
+            merged = self.search_mode == "both"
+            api = None if merged else self._pick_api()
+            # 只有书名、未指定序号或页码时，先尝试由本地书名索引直接给出详情
+            if item_index is None and not list_requested:
+                indexed = await self._lookup_title_index(book_name, (1, 2) if merged else (api,))
+                if indexed is not None:
+                    indexed_api, novel_id = indexed
+                    try:
+                        async for result in self._get_and_format_novel_details(event, session, novel_id, indexed_api):
+                            yield result
+                        return
+                    except (aiohttp.ClientResponseError, ValueError) as e:
+                        logger.warning(f"本地书名索引条目 (api {indexed_api}, ID {novel_id}) 已失效: {e}，改用远程搜索")
+                        if isinstance(e, ValueError) or e.status == 404:
+                            self._title_index.remove("ys", indexed_api, novel_id)
+            while True:
+                if merged:
+                    results_per_page = 35
+                else:
+                    results_per_page = 20 if api == 2 else 15
                 page_to_fetch = page_to_list
                 if item_index is not None:
                     if item_index == 0:
                         yield event.plain_result("❌ 序号必须从1开始。")
                         return
                     page_to_fetch = (item_index - 1) // results_per_page + 1
-                search_info = await self._perform_search(session, book_name, page=page_to_fetch)
-                if search_info is None or not search_info[0]:
-                    yield event.plain_result(f"😢 未找到关于【{book_name}】的任何书籍信息。")
-                    return
-                search_results, max_pages = search_info
-                if page_to_fetch > max_pages and max_pages > 0:
-                    yield event.plain_result(f"❌ 您请求的第 {page_to_fetch} 页不存在，【{book_name}】的搜索结果最多只有 {max_pages} 页。")
-                    return
-                if item_index is None and len(search_results) == 1 and max_pages == 1:
-                    selected_book = search_results[0]
-                    novel_id = selected_book.get('id')
-                    if not novel_id:
-                        yield event.plain_result("❌ 无法获取该书籍的ID。")
-                        return
-                    async for result in self._get_and_format_novel_details(event, session, str(novel_id)):
-                        yield result
+                start_num = (page_to_fetch - 1) * results_per_page + 1
+                if merged:
+                    # 合并结果去重后每页条数不固定，由 _merged_search_page 确定序号所在的页及本页起始序号
+                    search_info = await self._merged_search_page(session, book_name, page=page_to_list, item_index=item_index)
+                    if search_info is not None:
+                        search_results, max_pages, merged_page, start_num = search_info
+                        search_info = search_results, max_pages
+                        if item_index is None and merged_page < min(page_to_list, max_pages):
+                            # 总时限内未能合并到目标页，先展示已取得的最后一页
+                            yield event.plain_result(f"⏳ 搜索来源响应较慢，暂时只能合并到第 {merged_page} 页。")
+                            page_to_fetch = merged_page
+                        elif item_index is not None:
+                            page_to_fetch = merged_page
+                    break
+                search_info = await self._perform_search(session, book_name, page=page_to_fetch, api=api)
+                # 本次请求触发了熔断（如遇到挑战页）时，立即改用另一来源重试一次
+                if search_info is not None or self._api_health(api).available() or not self._api_health(3 - api).available():
+                    break
+                logger.warning(f"来源 {self._api_health(api).name} 已熔断，改用 {self._api_health(3 - api).name} 重新搜索 '{book_name}'")
+                api = 3 - api
+            if search_info is None and not merged and not self._api_health(api).available():
+                # 本次搜索使来源熔断且另一来源也不可用，按来源不可用答复而不是“未找到”
+                health = self._api_health(api)
+                raise SourceUnavailableError(health.name, health.retry_in)
+            if merged and search_info is not None and not search_info[0] and page_to_fetch > 1 and page_to_fetch <= search_info[1]:
+                yield event.plain_result(f"😢 【{book_name}】第 {page_to_fetch} 页的结果均已在前面的页中出现。")
+                return
+            if search_info is None or not search_info[0]:
+                yield event.plain_result(f"😢 未找到关于【{book_name}】的任何书籍信息。")
+                return
+            search_results, max_pages = search_info
+            if page_to_fetch > max_pages and max_pages > 0:
+                yield event.plain_result(f"❌ 您请求的第 {page_to_fetch} 页不存在，【{book_name}】的搜索结果最多只有 {max_pages} 页。")
+                return
+            if item_index is None and len(search_results) == 1 and max_pages == 1:
+                selected_book = search_results[0]
+                novel_id = selected_book.get('id')
+                if not novel_id:
+                    yield event.plain_result("❌ 无法获取该书籍的ID。")
                     return
-                if item_index is None:
-                    start_num = (page_to_fetch - 1) * results_per_page + 1
+                async for result in self._get_and_format_novel_details(event, session, str(novel_id), selected_book.get('api', api)):
+                    yield result
+                return
+            if item_index is None:
+                with self.metrics.timer("build", str(api) if api else "both"):
                     message_text = f"以下是【{book_name}】的第 {page_to_fetch}/{max_pages} 页搜索结果:\n"
                     for i, book in enumerate(search_results):
                         num = start_num + i
@@ -678,64 +1532,409 @@ class YoushuSearchPlugin(Star):
                         author = book.get('author_name', '未知作者')
                         score = book.get('score', 'N/A')
                         scorer = book.get('scorer', '0')
-                        message_text += f"{num}. {name}\n    作者：{author} | 评分: {score} ({scorer}人)\n"
+                        message_text += f"{num}. {name}\n    作者：{author} | 评分: {score} ({scorer}人)"
+                        if merged:
+                            message_text += f" | 来源: {'ypshuo' if book.get('api') == 1 else 'youshu'}"
+                        message_text += "\n"
                     message_text += f"\n💡 请使用 `/ys {book_name} <序号>` 查看详情"
                     if page_to_fetch < max_pages:
                         message_text += f"，或 `/ys {book_name} -{page_to_fetch + 1}` 翻页。"
-                    yield event.plain_result(message_text)
-                else:
-                    index_on_page = (item_index - 1) % results_per_page
-                    if not (0 <= index_on_page < len(search_results)):
-                        yield event.plain_result(f"❌ 序号【{item_index}】在第 {page_to_fetch} 页上不存在。")
-                        return
-                    selected_book = search_results[index_on_page]
-                    novel_id = selected_book.get('id')
-                    if not novel_id:
-                        yield event.plain_result(f"❌ 无法获取序号为【{item_index}】的书籍ID。")
-                        return
-                    async for result in self._get_and_format_novel_details(event, session, str(novel_id)):
-                        yield result
+                yield event.plain_result(message_text)
+                self._save_cursor("ys", event, book_name, page_to_fetch, start_num, results_per_page, max_pages, search_results, api)
+                self._schedule_prefetch(event, ("ys", normalize_keyword(book_name)), book_name, page_to_fetch, max_pages, search_results, api)
+            else:
+                self._save_cursor("ys", event, book_name, page_to_fetch, start_num, results_per_page, max_pages, search_results, api)
+                index_on_page = item_index - start_num
+                if merged and index_on_page >= len(search_results) and page_to_fetch < max_pages:
+                    # 总时限内只合并到了第 page_to_fetch 页，序号可能在后面的页中
+                    yield event.plain_result(f"⏳ 搜索来源响应较慢，暂时只能合并到第 {page_to_fetch} 页（序号 {start_num + len(search_results) - 1}），请稍后再试。")
+                    return
+                if not (0 <= index_on_page < len(search_results)):
+                    yield event.plain_result(f"❌ 序号【{item_index}】在第 {page_to_fetch} 页上不存在。")
+                    return
+                selected_book = search_results[index_on_page]
+                novel_id = selected_book.get('id')
+                if not novel_id:
+                    yield event.plain_result(f"❌ 无法获取序号为【{item_index}】的书籍ID。")
+                    return
+                async for result in self._get_and_format_novel_details(event, session, str(novel_id), selected_book.get('api', api)):
+                    yield result
+        except (SourceUnavailableError, ChallengePageError) as e:
+            logger.warning(f"搜索书籍 '{book_name}' 失败: {e}")
+            yield event.plain_result(f"❌ 书籍来源暂时不可用，请稍后再试。({e})")
         except Exception as e:
             logger.error(f"搜索书籍 '{book_name}' 失败: {e}", exc_info=True)
             yield event.plain_result(f"❌ 搜索书籍时发生未知错误: {str(e)}")
 
-    @filter.command("随机小说")
-    async def youshu_random_command(self, event: AstrMessageEvent):
-        max_retries = 10
-        async with aiohttp.ClientSession() as session:
+    # 书单中常见的序号前缀，如 "1." "2、" "(3)"
+    _BATCH_NUMBERING = re.compile(r"^\s*(?:\d+\s*[.、:：)）]|[(（]\d+[)）])\s*")
+
+    def _split_batch_titles(self, text: str) -> List[str]:
+        """
+        按 | 或换行拆分书名，去掉序号前缀与书名号，忽略空项与重复项。只有一个书名时返回的列表长度为 1。
+        """
+        if not re.search(r"[|｜\n]", text):
+            return [text.strip()]
+        titles, seen = [], set()
+        for part in re.split(r"[|｜\n]", text):
+            title = self._BATCH_NUMBERING.sub("", part).strip().strip("《》").strip()
+            key = normalize_keyword(title)
+            if title and key not in seen:
+                seen.add(key)
+                titles.append(title)
+        return titles
+
+    async def _resolve_batch_title(self, session: aiohttp.ClientSession, title: str, api: Optional[int]) -> Optional[Dict]:
+        """
+        查询单个书名并返回摘要所需的信息，未找到时返回 None。优先使用本地书名索引，否则取搜索结果中
+        书名完全一致的一本（没有则取第一本）再获取详情；详情获取失败时退回搜索结果中的字段。
+        """
+        apis = (1, 2) if api is None else (api,)
+        indexed = await self._lookup_title_index(title, apis)
+        if indexed is not None:
+            indexed_api, novel_id = indexed
+            try:
+                return {**await self._fetch_novel_info(session, novel_id, indexed_api), 'api': indexed_api}
+            except (aiohttp.ClientResponseError, ValueError) as e:
+                logger.warning(f"本地书名索引条目 (api {indexed_api}, ID {novel_id}) 已失效: {e}，改用远程搜索")
+        if api is None:
+            search_info = await self._perform_merged_search(session, title)
+        else:
+            search_info = await self._perform_search(session, title, api=api)
+        if search_info is None or not search_info[0]:
+            return None
+        results = search_info[0]
+        wanted = normalize_title(title)
+        book = next((b for b in results if normalize_title(b.get('novel_name', '')) == wanted), results[0])
+        book_api = book.get('api', api)
+        if book.get('id'):
+            try:
+                return {**book, **await self._fetch_novel_info(session, str(book['id']), book_api), 'api': book_api}
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, SourceUnavailableError, ChallengePageError) as e:
+                logger.warning(f"批量查询 '{title}' 获取详情失败，使用搜索结果: {e}")
+        return {**book, 'api': book_api}
+
+    def _format_batch_line(self, num: int, title: str, info: Optional[Dict], error: Optional[str]) -> str:
+        if error is not None:
+            return f"{num}. {title} → {error}"
+        if info is None:
+            return f"{num}. {title} → 😢 未找到"
+        name = info.get('novel_name', title)
+        line = f"{num}. " if normalize_title(name) == normalize_title(title) else f"{num}. {title} → "
+        line += f"【{name}】{info.get('author_name', '未知作者')}"
+        score, scorer = info.get('score'), info.get('scorer')
+        if score not in (None, '', '无'):
+            line += f" | 评分 {score}" + (f" ({scorer}人)" if scorer not in (None, '', '无', '0') else "")
+        if info.get('status') not in (None, '', '无'):
+            line += f" | {info['status']}"
+        word_number = info.get('word_number')
+        if isinstance(word_number, (int, float)):
+            line += f" | {word_number / 10000:.1f}万字"
+        return line
+
+    async def _youshu_batch_search(self, event: AstrMessageEvent, titles: List[str]):
+        """
+        批量查询：以 batch_concurrency 为并发上限同时查询所有书名，batch_deadline 秒后未完成的标记为超时，
+        最后合并为一条摘要。
+        """
+        skipped = titles[self.batch_max_titles:]
+        titles = titles[:self.batch_max_titles]
+        logger.info(f"用户 {event.get_sender_id()} 触发 /ys 批量查询 {len(titles)} 本: {titles}")
+        started = time.perf_counter()
+        try:
+            session = await self._get_session()
+            api = None if self.search_mode == "both" else self._pick_api()
+        except SourceUnavailableError as e:
+            yield event.plain_result(f"❌ 书籍来源暂时不可用，请稍后再试。({e})")
+            return
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def resolve(title: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self._resolve_batch_title(session, title, api)
+
+        tasks = [asyncio.create_task(resolve(title)) for title in titles]
+        _, pending = await asyncio.wait(tasks, timeout=self.batch_deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            # 等待被取消的查询真正结束，释放其占用的连接与信号量，也避免其异常无人取回
+            await asyncio.gather(*pending, return_exceptions=True)
+        with self.metrics.timer("build", "batch"):
+            lines = []
+            for num, (title, task) in enumerate(zip(titles, tasks), start=1):
+                info, error = None, None
+                if task in pending:
+                    error = "⏱️ 超时"
+                elif task.exception() is not None:
+                    e = task.exception()
+                    logger.warning(f"批量查询 '{title}' 失败: {e}")
+                    error = "❌ 来源暂时不可用" if isinstance(e, (SourceUnavailableError, ChallengePageError)) else "❌ 查询失败"
+                else:
+                    info = task.result()
+                lines.append(self._format_batch_line(num, title, info, error))
+            found = sum(1 for task in tasks if task not in pending and task.exception() is None and task.result() is not None)
+            message_text = f"📚 批量查询 {len(titles)} 本，找到 {found} 本（用时 {time.perf_counter() - started:.1f}s）:\n"
+            message_text += "\n".join(lines)
+            if skipped:
+                message_text += f"\n\n⚠️ 一次最多查询 {self.batch_max_titles} 本，已忽略其余 {len(skipped)} 本。"
+            message_text += "\n\n💡 使用 `/ys <书名>` 查看单本详情。"
+        yield event.plain_result(message_text)
+
+    async def _get_id_index(self, api: Optional[int] = None) -> Optional[NovelIdIndex]:
+        """
+        懒加载指定来源（默认为当前来源）的书籍ID索引。
+        """
+        if not self.id_index_enabled:
+            return None
+        api = api or self.api
+        index = self._id_indexes.get(api)
+        if index is None:
+            name = "ypshuo" if api == 1 else "youshu"
+            index = self._id_indexes[api] = NovelIdIndex(self.data_dir / "id_index", name)
+        if not index.loaded:
+            try:
+                await asyncio.to_thread(index.load)
+            except OSError as e:
+                logger.warning(f"⚠️ 加载书籍ID索引失败: {e}")
+                index.loaded = True
+        return index
+
+    async def _record_novel_id(self, novel_id, valid: bool, api: Optional[int] = None):
+        """
+        把详情页查询的结果（存在或 404）记录到书籍ID索引，并定期落盘。
+        """
+        try:
+            novel_id = int(novel_id)
+        except (TypeError, ValueError):
+            return
+        index = await self._get_id_index(api)
+        if index is None:
+            return
+        if valid:
+            index.mark_valid(novel_id)
+        else:
+            index.mark_invalid(novel_id)
+        if index.should_flush:
+            try:
+                await asyncio.to_thread(index.save)
+            except OSError as e:
+                logger.warning(f"⚠️ 保存书籍ID索引失败: {e}")
+
+    def _recent_random(self, api: Optional[int] = None) -> deque:
+        api = api or self.api
+        recent = self._recent_random_ids.get(api)
+        if recent is None:
+            recent = self._recent_random_ids[api] = deque(maxlen=self.random_recent_size)
+        return recent
+
+    async def _pick_random_ids(self, latest_id: int, count: int, api: Optional[int] = None) -> List[int]:
+        index = await self._get_id_index(api)
+        recent = set(self._recent_random(api))
+        candidates: List[int] = []
+        for _ in range(count * 4):
+            if len(candidates) >= count:
+                break
+            if index is not None:
+                novel_id = index.random_candidate(latest_id, self.id_index_prefer_known, exclude=recent)
+            else:
+                novel_id = random.randint(1, latest_id)
+                if novel_id in recent:
+                    continue
+            if novel_id not in candidates:
+                candidates.append(novel_id)
+        return candidates
+
+    def _ensure_id_crawler(self):
+        if self.id_crawler_enabled and self.id_index_enabled and (self._id_crawler_task is None or self._id_crawler_task.done()):
+            self._id_crawler_task = asyncio.create_task(self._id_crawler_loop())
+
+    async def _id_crawler_loop(self):
+        """
+        低优先级后台任务：每隔一段时间探测一个状态未知的ID来补充索引。
+        有用户请求正在占用探测并发时跳过本轮。
+        """
+        logger.info(f"书籍ID索引后台补全已启动，间隔 {self.id_crawler_interval}s")
+        while True:
+            await asyncio.sleep(self.id_crawler_interval)
             try:
+                session = await self._get_session()
                 latest_id = await self._get_latest_novel_id(session)
-                if not latest_id:
-                    yield event.plain_result("❌ 抱歉，未能获取到最新的小说ID，无法进行随机搜索。")
-                    return
+                index = await self._get_id_index()
+                if not latest_id or index is None:
+                    continue
+                host = urlparse(self._novel_url("1")).hostname
+                semaphore = self._probe_semaphores.get(host)
+                if semaphore is not None and semaphore.locked():
+                    continue
+                novel_id = index.random_unknown(latest_id)
+                if novel_id is not None:
+                    await self._probe_novel_id(session, novel_id)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"获取最新ID时发生错误: {e}", exc_info=True)
-                yield event.plain_result("❌ 获取最新小说ID时出错，请稍后再试。")
+                logger.warning(f"⚠️ 书籍ID索引后台补全失败: {e}")
+
+    async def _probe_novel_id(self, session: aiohttp.ClientSession, novel_id: int, api: Optional[int] = None) -> Optional[int]:
+        """
+        探测随机ID是否对应有效的书籍详情页，成功时详情已写入缓存。
+        404、超时或无法解析时返回 None，其他 HTTP 错误向上抛出。
+        """
+        host = urlparse(self._novel_url(str(novel_id), api)).hostname
+        semaphore = self._probe_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._probe_semaphores[host] = asyncio.Semaphore(self.random_probe_concurrency)
+        async with semaphore:
+            try:
+                await self._fetch_novel_info(session, str(novel_id), api)
+                return novel_id
+            except aiohttp.ClientResponseError as e:
+                if e.status == 404:
+                    logger.warning(f"页面 {novel_id} 不存在 (404)。")
+                    return None
+                raise
+            except (ValueError, asyncio.TimeoutError) as e:
+                logger.warning(f"处理随机ID {novel_id} 失败: {e}")
+                return None
+
+    async def _find_random_novel_id(self, session: aiohttp.ClientSession, latest_id: int, max_attempts: int, api: Optional[int] = None) -> Optional[int]:
+        """
+        每轮同时探测一批随机ID，按抽取顺序取第一个确认有效的ID，并取消同批其余请求。
+        不按完成先后取结果：已在详情缓存中的ID会立即完成，若先完成者胜出，结果会偏向用户看过的书。
+        """
+        attempts = 0
+        while attempts < max_attempts:
+            batch_size = min(self.random_probe_batch, max_attempts - attempts)
+            candidates = await self._pick_random_ids(latest_id, batch_size, api)
+            attempts += batch_size
+            logger.info(f"第 {attempts}/{max_attempts} 次尝试随机ID: {candidates}")
+            tasks = [asyncio.create_task(self._probe_novel_id(session, candidate, api)) for candidate in candidates]
+            try:
+                for task in tasks:
+                    novel_id = await task
+                    if novel_id is not None:
+                        self._recent_random(api).append(novel_id)
+                        return novel_id
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return None
+
+    @filter.command("随机小说")
+    async def youshu_random_command(self, event: AstrMessageEvent):
+        async for result in self._timed_command("random", self._youshu_random(event)):
+            yield result
+
+    async def _youshu_random(self, event: AstrMessageEvent):
+        max_retries = 10
+        session = await self._get_session()
+        self._ensure_id_crawler()
+        try:
+            api = self._pick_api()
+            latest_id = await self._get_latest_novel_id(session, api)
+            if not latest_id and not self._api_health(api).available() and self._api_health(3 - api).available():
+                api = 3 - api
+                latest_id = await self._get_latest_novel_id(session, api)
+            if not latest_id:
+                yield event.plain_result("❌ 抱歉，未能获取到最新的小说ID，无法进行随机搜索。")
                 return
-            for attempt in range(max_retries):
-                random_id = random.randint(1, latest_id)
-                logger.info(f"第 {attempt + 1}/{max_retries} 次尝试随机ID: {random_id}")
-                try:
-                    async for result in self._get_and_format_novel_details(event, session, str(random_id)):
-                        yield result
-                    return
-                except aiohttp.ClientResponseError as e:
-                    if e.status == 404:
-                        logger.warning(f"页面 {random_id} 不存在 (404)，正在重试...")
-                        continue
-                    else:
-                        logger.error(f"访问随机页面时发生HTTP错误: {e.status}", exc_info=True)
-                        yield event.plain_result(f"❌ 访问随机页面时出错: HTTP {e.status}")
-                        return
-                except (ValueError, asyncio.TimeoutError) as e:
-                    logger.warning(f"处理随机ID {random_id} 失败: {e}，正在重试...")
-                    continue
-                except Exception as e:
-                    logger.error(f"处理随机ID {random_id} 时发生未知错误: {e}", exc_info=True)
-                    yield event.plain_result(f"❌ 处理随机书籍时发生未知错误。")
-                    return
-        yield event.plain_result("😢 抱歉，多次尝试后仍未找到有效的小说页面。请稍后再试。")
+        except SourceUnavailableError as e:
+            yield event.plain_result(f"❌ 书籍来源暂时不可用，请稍后再试。({e})")
+            return
+        except Exception as e:
+            logger.error(f"获取最新ID时发生错误: {e}", exc_info=True)
+            yield event.plain_result("❌ 获取最新小说ID时出错，请稍后再试。")
+            return
+        try:
+            novel_id = await self._find_random_novel_id(session, latest_id, max_retries, api)
+        except (SourceUnavailableError, ChallengePageError) as e:
+            logger.warning(f"探测随机ID失败: {e}")
+            yield event.plain_result(f"❌ 书籍来源暂时不可用，请稍后再试。({e})")
+            return
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"访问随机页面时发生HTTP错误: {e.status}", exc_info=True)
+            yield event.plain_result(f"❌ 访问随机页面时出错: HTTP {e.status}")
+            return
+        except Exception as e:
+            logger.error(f"探测随机ID时发生未知错误: {e}", exc_info=True)
+            yield event.plain_result(f"❌ 处理随机书籍时发生未知错误。")
+            return
+        if novel_id is None:
+            yield event.plain_result("😢 抱歉，多次尝试后仍未找到有效的小说页面。请稍后再试。")
+            return
+        try:
+            async for result in self._get_and_format_novel_details(event, session, str(novel_id), api):
+                yield result
+        except Exception as e:
+            logger.error(f"处理随机ID {novel_id} 时发生未知错误: {e}", exc_info=True)
+            yield event.plain_result(f"❌ 处理随机书籍时发生未知错误。")
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ys_stats")
+    async def ys_stats_command(self, event: AstrMessageEvent):
+        """查看各阶段耗时分位数、缓存命中率与来源健康度（仅管理员）"""
+        def ms(seconds: Optional[float]) -> str:
+            return f"{seconds * 1000:.0f}" if seconds is not None else "-"
+
+        uptime = (time.time() - self.metrics.started_at) / 60
+        lines = [f"📊 小说搜索插件统计（运行 {uptime:.0f} 分钟）", "阶段 来源 结果: 次数 | p50/p95/p99 (ms)"]
+        for (stage, source, outcome), histogram in self.metrics.series():
+            lines.append(
+                f"{stage} {source} {outcome}: {histogram.count} | "
+                f"{ms(histogram.percentile(0.5))}/{ms(histogram.percentile(0.95))}/{ms(histogram.percentile(0.99))}"
+            )
+        if len(lines) == 2:
+            lines.append("（暂无数据）")
+        lines.append("\n缓存命中率:")
+        for (labels,), ratio in self._metrics_gauges()["cache_hit_ratio"].items():
+            lines.append(f"  {labels[1]}: {ratio:.0%}")
+        lines.append("负缓存命中: " + "，".join(f"{name} {cache.hits} 次" for name, cache in self.negative_caches.items()))
+        lines.append(f"合并请求: 实际发出 {self._single_flight.executed} 次，共享 {self._single_flight.shared} 次")
+        early_closes = self.stream_stats['early_closes']
+        lines.append(
+            f"流式读取: 提前断开 {early_closes} 次，未读取 {self.stream_stats['bytes_unconsumed'] / 1024:.0f}KB"
+            f"（平均每次 {self.stream_stats['bytes_unconsumed'] / early_closes / 1024 if early_closes else 0:.1f}KB，不等于少传输的流量），"
+            f"前缀不完整改读全文 {self.stream_stats['fallbacks']} 次"
+        )
+        lines.append("来源健康:")
+        for health in self._source_health.values():
+            lines.append(f"  {health.describe()}")
+        if self.metrics_export_path:
+            lines.append(f"Prometheus 导出文件: {self._metrics_export_file()}")
+        yield event.plain_result("\n".join(lines))
 
     async def terminate(self):
         """插件销毁时的清理工作"""
-        logger.info("小说搜索插件已卸载")
\ No newline at end of file
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+        if self.metrics_export_path:
+            await self._export_metrics()
+        if self._id_crawler_task is not None:
+            self._id_crawler_task.cancel()
+        for _, task in list(self._prefetch_tasks.values()):
+            task.cancel()
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        if self._cache_persist_task is not None:
+            self._cache_persist_task.cancel()
+        await self._persist_caches()
+        for index in self._id_indexes.values():
+            if not index.dirty:
+                continue
+            try:
+                await asyncio.to_thread(index.save)
+            except OSError as e:
+                logger.warning(f"⚠️ 保存书籍ID索引失败: {e}")
+        if self._title_index is not None and self._title_index.dirty:
+            try:
+                await asyncio.to_thread(self._title_index.flush)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ 保存本地书名索引失败: {e}")
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("小说搜索插件已卸载")
@@ -0,0 +1,97 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 直方图分桶上界（秒），与 Prometheus 默认分桶相近，上限放宽到搜索超时
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+# (阶段, 来源, 结果)
+SeriesKey = Tuple[str, str, str]
+
+
+class Histogram:
+    """
+    固定分桶的耗时直方图。分桶计数用于 Prometheus 导出，另保留最近 window 个样本计算准确的分位数。
+    """
+
+    def __init__(self, window: int = 1024):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._recent: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.sum += seconds
+        self._recent.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        samples = sorted(self._recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Metrics:
+    """
+    按 (阶段, 来源, 结果) 分组的耗时统计。阶段如 connect、ttfb、body、decode、parse、build、cover、resize、encode、command、first_reply（指令首条回复）；
+    来源为 "1"（ypshuo.com）、"2"（youshu.me）、"hs"（uaa）或 "other"。
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._series: Dict[SeriesKey, Histogram] = {}
+        self.started_at = time.time()
+
+    def observe(self, stage: str, source: str, outcome: str, seconds: float) -> None:
+        key = (stage, source, outcome)
+        histogram = self._series.get(key)
+        if histogram is None:
+            histogram = self._series[key] = Histogram(self.window)
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, source: str) -> Iterator[None]:
+        """
+        计时一段代码，正常结束记为 ok，抛出异常记为 error。
+        """
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.observe(stage, source, outcome, time.perf_counter() - started)
+
+    def series(self) -> List[Tuple[SeriesKey, Histogram]]:
+        return sorted(self._series.items())
+
+    def render_prometheus(self, gauges: Optional[Dict[str, Dict[Tuple[Tuple[str, str], ...], float]]] = None, prefix: str = "youshusearch") -> str:
+        """
+        生成 Prometheus 文本格式（可供 node_exporter textfile collector 采集）。
+        gauges: 指标名 -> {标签元组: 数值}，用于导出缓存命中率等附加数值。
+        """
+        name = f"{prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per stage.", f"# TYPE {name} histogram"]
+        for (stage, source, outcome), histogram in self.series():
+            labels = f'stage="{stage}",source="{source}",outcome="{outcome}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        for gauge, values in (gauges or {}).items():
+            gauge_name = f"{prefix}_{gauge}"
+            lines.append(f"# TYPE {gauge_name} gauge")
+            for label_pairs, value in values.items():
+                labels = ",".join(f'{key}="{val}"' for key, val in label_pairs)
+                lines.append(f"{gauge_name}{{{labels}}} {value}" if labels else f"{gauge_name} {value}")
+        return "\n".join(lines) + "\n"
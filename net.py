@@ -0,0 +1,327 @@
+import asyncio
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import aiohttp
+
+
+# Cloudflare 等防护返回的验证页特征
+_CHALLENGE_MARKERS = (b"challenge-platform", b"cf_chl_opt", b"<title>Just a moment...</title>", b"Attention Required! | Cloudflare")
+
+
+class ChallengePageError(Exception):
+    """
+    上游返回了人机验证/挑战页而非正常内容，通常意味着 Cookie 失效或请求被拦截。
+    """
+
+    def __init__(self, url: str, status: int):
+        super().__init__(f"{url} 返回了挑战页 (HTTP {status})")
+        self.url = url
+        self.status = status
+
+
+def looks_like_challenge(body: bytes) -> bool:
+    head = body[:65536]
+    return any(marker in head for marker in _CHALLENGE_MARKERS)
+
+
+@dataclass
+class FetchResult:
+    """
+    一次 HTTP 请求的完整结果。响应体已读入内存，可安全地在协程之间共享。
+    """
+    url: str
+    status: int
+    body: bytes = b""
+    charset: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # 流式读取在找到所需内容后提前断开时为 True，此时 body 只是响应的前缀
+    truncated: bool = False
+    # 提前断开时程序未读取（未消费）的响应字节数：Content-Length 减去已读取的原始（压缩）字节数。
+    # 这部分数据多半已经到达本机的套接字缓冲区，并不等于网络上少传输的流量；
+    # 响应未给出 Content-Length（分块传输）时无法得知，为 None
+    bytes_unconsumed: Optional[int] = None
+    # 从发出请求到收到响应头（含建立连接）的耗时，以及读取响应体的耗时，单位秒
+    ttfb: float = 0.0
+    body_seconds: float = 0.0
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    def text(self, errors: str = "replace") -> str:
+        return self.body.decode(self.charset or "utf-8", errors=errors)
+
+    def json(self) -> Any:
+        return json.loads(self.text())
+
+
+# 流式读取的结束条件：按顺序出现的 (标记, 次数)
+Markers = Sequence[Tuple[str, int]]
+
+
+class MarkerMatcher:
+    """
+    增量匹配器：在不断增长的响应前缀中按顺序查找标记，每个标记需出现指定次数后才开始找下一个。
+    每次只从上次的位置继续扫描，不会重复扫描已读过的内容。
+    """
+
+    def __init__(self, markers: Markers, encoding: str = "utf-8"):
+        try:
+            self._steps = [(marker.encode(encoding), count) for marker, count in markers]
+        except (LookupError, UnicodeEncodeError):
+            self._steps = [(marker.encode("utf-8"), count) for marker, count in markers]
+        self._step = 0
+        self._seen = 0
+        self._pos = 0
+
+    def feed(self, buffer: bytes) -> bool:
+        """
+        传入目前读到的完整前缀，所有标记都已出现时返回 True。
+        """
+        while self._step < len(self._steps):
+            marker, count = self._steps[self._step]
+            index = buffer.find(marker, self._pos)
+            if index < 0:
+                self._pos = max(self._pos, len(buffer) - len(marker) + 1)
+                return False
+            self._pos = index + len(marker)
+            self._seen += 1
+            if self._seen >= count:
+                self._step += 1
+                self._seen = 0
+        return True
+
+
+def _decompressor(content_encoding: str):
+    """
+    按 Content-Encoding 返回增量解压器，未压缩时返回 None。流式读取只声明接受 gzip 与 deflate。
+    """
+    encoding = content_encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        # wbits 加 32 时自动识别 gzip 与 zlib 头
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)
+    raise aiohttp.ClientPayloadError(f"不支持的 Content-Encoding: {content_encoding}")
+
+
+async def fetch(
+    session: aiohttp.ClientSession,
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    until: Optional[Markers] = None,
+    chunk_size: int = 16384,
+) -> FetchResult:
+    """
+    发起 GET 请求并读取响应体。HTTP 4xx/5xx 会抛出 aiohttp.ClientResponseError，
+    挑战页会抛出 ChallengePageError。
+
+    指定 until 时分块读取，一旦 until 中的标记全部出现就关闭连接，只返回已读到的前缀。
+    此时自行解压响应（只接受 gzip/deflate），以便按原始字节统计未读取的部分。
+    """
+    kwargs: Dict[str, Any] = {"params": params, "headers": headers}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if until:
+        kwargs["headers"] = {**(headers or {}), "Accept-Encoding": "gzip, deflate"}
+        kwargs["auto_decompress"] = False
+    started = time.perf_counter()
+    async with session.get(url, **kwargs) as response:
+        headers_at = time.perf_counter()
+        if response.headers.get("cf-mitigated") == "challenge":
+            raise ChallengePageError(str(response.url), response.status)
+        response.raise_for_status()
+        truncated = False
+        bytes_unconsumed = None
+        if until:
+            matcher = MarkerMatcher(until, response.charset or "utf-8")
+            decompressor = _decompressor(response.headers.get("Content-Encoding", ""))
+            buffer = bytearray()
+            raw_read = 0
+            async for chunk in response.content.iter_chunked(chunk_size):
+                raw_read += len(chunk)
+                buffer.extend(decompressor.decompress(chunk) if decompressor else chunk)
+                if matcher.feed(buffer) and not response.content.at_eof():
+                    truncated = True
+                    break
+            if decompressor and not truncated:
+                buffer.extend(decompressor.flush())
+            body = bytes(buffer)
+            if truncated:
+                # 剩余内容不再读取，连接无法复用，直接关闭
+                response.close()
+                if response.content_length is not None:
+                    bytes_unconsumed = max(0, response.content_length - raw_read)
+        else:
+            body = await response.read()
+        body_seconds = time.perf_counter() - headers_at
+        if response.content_type == "text/html" and looks_like_challenge(body):
+            raise ChallengePageError(str(response.url), response.status)
+        return FetchResult(
+            url=str(response.url),
+            status=response.status,
+            body=body,
+            charset=response.charset,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            truncated=truncated,
+            bytes_unconsumed=bytes_unconsumed,
+            ttfb=headers_at - started,
+            body_seconds=body_seconds,
+        )
+
+
+def connect_trace_config(on_connect: Callable[[str, float], None]) -> aiohttp.TraceConfig:
+    """
+    记录新建连接（DNS、TCP 与 TLS 握手）耗时的 TraceConfig，复用连接池中的连接时不会触发。
+    on_connect(host, seconds) 在事件循环中同步调用。
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.host = params.url.host or ""
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, context, params):
+        started = getattr(context, "connect_started", None)
+        if started is not None:
+            on_connect(getattr(context, "host", ""), time.perf_counter() - started)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+def conditional_headers(headers: Dict[str, str], etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """
+    在原请求头基础上附加 If-None-Match / If-Modified-Since，用于条件请求重新验证缓存。
+    """
+    merged = dict(headers)
+    if etag:
+        merged["If-None-Match"] = etag
+    if last_modified:
+        merged["If-Modified-Since"] = last_modified
+    return merged
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 头，支持秒数与 HTTP 日期两种格式，返回需要等待的秒数。
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError))
+
+
+class TokenBucket:
+    """
+    令牌桶限速：平均每秒 rate 个请求，允许 burst 个突发。rate <= 0 表示不限速。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostPolicy:
+    """
+    单个站点的请求策略：令牌桶限速、并发上限，以及对 429/5xx/超时的指数退避重试。
+
+    收到 429/503 时会按 Retry-After（或退避时长）让该站点整体冷却，期间所有新请求都会等待，
+    避免在对方限流时继续放大请求量。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 0,
+        burst: int = 1,
+        concurrency: int = 4,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = max(0.0, float(backoff_base))
+        self.backoff_max = max(0.0, float(backoff_max))
+        self._cooldown_until = 0.0
+        self.retries = 0
+
+    def _backoff(self, attempt: int) -> float:
+        # 全抖动 (full jitter) 指数退避
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def run(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 0
+        while True:
+            cooldown = self._cooldown_until - time.monotonic()
+            if cooldown > 0:
+                await asyncio.sleep(cooldown)
+            await self.bucket.acquire()
+            try:
+                async with self.semaphore:
+                    return await factory()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                if isinstance(e, aiohttp.ClientResponseError) and e.status in (429, 503):
+                    retry_after = parse_retry_after(e.headers.get("Retry-After") if e.headers else None)
+                    if retry_after is not None:
+                        if retry_after > self.backoff_max:
+                            self._cooldown_until = max(self._cooldown_until, time.monotonic() + retry_after)
+                            raise
+                        delay = max(delay, retry_after)
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
@@ -0,0 +1,401 @@
+import base64
+import re
+import time
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Pattern
+from urllib.parse import urljoin
+
+YS_PLATFORMS = {"他站", "本站", "起点", "晋江", "番茄", "刺猬猫", "纵横", "飞卢", "17K", "有毒", "息壤", "铁血", "逐浪", "掌阅", "塔读", "独阅读", "少年梦", "SF", "豆瓣", "知乎", "公众号"}
+YS_CATEGORIES = {"玄幻", "奇幻", "武侠", "仙侠", "都市", "现实", "军事", "历史", "悬疑", "游戏", "竞技", "科幻", "灵异", "二次元", "同人", "其他", "穿越时空", "架空历史", "总裁豪门", "都市言情", "仙侠奇缘", "幻想言情", "悬疑推理", "耽美纯爱", "衍生同人", "轻小说", "综合其他"}
+YS_STATUSES = {"连载中", "已完结", "已太监"}
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+_LINE_BREAK_RE = re.compile(r'[\r\n\t]+')
+_FULLTEXT_RE = re.compile(r'\.{3,}全文$')
+_DIGITS_RE = re.compile(r'(\d+)')
+
+
+def clean_html(raw_html: str) -> str:
+    return _TAG_RE.sub('', raw_html).strip()
+
+
+def clean_html_content(text: Optional[str]) -> str:
+    if not text:
+        return '无'
+    text = _TAG_RE.sub('', text)
+    text = _SPACE_RE.sub(' ', text).strip()
+    text = _FULLTEXT_RE.sub('...', text).strip()
+    return text if text else '无'
+
+
+def _search_before_anchor(pattern: Pattern, html: str, anchor: str) -> Optional[re.Match]:
+    """
+    对以固定文本 anchor 结尾、且不跨行的正则，先定位 anchor 所在行再在该行内匹配，
+    避免正则引擎从文档开头逐个位置尝试。结果与 pattern.search(html) 一致。
+    """
+    anchor_pos = html.find(anchor)
+    if anchor_pos < 0:
+        return None
+    line_start = html.rfind('\n', 0, anchor_pos) + 1
+    match = pattern.search(html, line_start, anchor_pos + len(anchor))
+    return match or pattern.search(html, line_start)
+
+
+class YpshuoExtractor:
+    """
+    ypshuo.com (api == 1) 页面解析器。搜索走 JSON 接口，这里只负责详情页与首页。
+    """
+    OG_IMAGE = re.compile(r'<meta[^>]*?name="og:image"[^>]*?content="(.*?)"')
+    BOOK_IMG = re.compile(r'<img src="(.*?)"[^>]*?class="book-img"')
+    NAME = re.compile(r'<h1 class="book-name".*?>(.*?)</h1>', re.DOTALL)
+    AUTHOR = re.compile(r'作者：<span class="text-red-500".*?>(.*?)</span>')
+    TAG_BLOCK = re.compile(r'<div class="tag-list"[^>]*?>(.*?)</div>', re.DOTALL)
+    TAG = re.compile(r'<span[^>]*?>(.*?)</span>')
+    WORD_COUNT = re.compile(r'字数：(.*?)万字')
+    SCORE_ITEM = re.compile(r'<div class="item"[^>]*?>\s*<p class="score"[^>]*?>\s*(.*?)\s*</p>\s*<p[^>]*?>(.*?)</p>\s*</div>', re.DOTALL)
+    STATUS = re.compile(r'状态：\s*(.*?)\s*<')
+    UPDATE_TIME = re.compile(r'更新时间：\s*(.*?)\s*</div>')
+    REVIEW = re.compile(
+        r'<div class="author-info"[^>]*?>(.*?)</div>'r'.*?'r'aria-valuenow="([^"]+)"'r'.*?'r'<span class="content-inner-details"[^>]*?>(.*?)</span>', re.DOTALL)
+    SYNOPSIS = re.compile(r'<div style="white-space:pre-wrap;"[^>]*?>(.*?)</div>', re.DOTALL)
+    LINK = re.compile(r'<a href="(http.*?)".*?rel="nofollow".*?>')
+    NOVEL_LINK = re.compile(r'href="/novel/(\d+)\.html"')
+    MAX_REVIEWS = 3
+    # 详情页读到第 MAX_REVIEWS 条书评的正文结束即可停止；首页需要全部链接取最大值，无法提前停止
+    DETAIL_UNTIL = (('<div class="author-info"', MAX_REVIEWS), ('<span class="content-inner-details"', 1), ('</span>', 1))
+    LATEST_ID_UNTIL = None
+    # 完整页面上应解析出的字段；流式读取的前缀缺少其中任何一项时，改为读取完整页面
+    DETAIL_FIELDS = ('novel_name', 'author_name', 'status', 'update_time_str', 'synopsis', 'tags')
+
+    def parse_detail(self, html: str, base_url: str) -> Dict:
+        novel_info = {}
+        head_end = html.find('</head>')
+        og_image_match = self.OG_IMAGE.search(html, 0, head_end) if head_end >= 0 else None
+        if og_image_match is None:
+            og_image_match = self.OG_IMAGE.search(html)
+        if og_image_match:
+            image_url = og_image_match.group(1)
+            if image_url.startswith('//'):
+                image_url = 'https:' + image_url
+            elif image_url.startswith('/'):
+                image_url = urljoin(base_url, image_url)
+            novel_info['image_url'] = image_url
+        else:
+            image_match = self.BOOK_IMG.search(html)
+            if image_match:
+                image_url = image_match.group(1)
+                if image_url.startswith('/'):
+                    image_url = urljoin(base_url, image_url)
+                novel_info['image_url'] = image_url
+            else:
+                novel_info['image_url'] = None
+        name_match = self.NAME.search(html)
+        novel_info['novel_name'] = name_match.group(1).strip() if name_match else '无'
+        author_match = self.AUTHOR.search(html)
+        novel_info['author_name'] = author_match.group(1).strip() if author_match else '无'
+        novel_info['tags'] = []
+        tag_block_match = self.TAG_BLOCK.search(html)
+        if tag_block_match:
+            tags_list = self.TAG.findall(tag_block_match.group(1))
+            if tags_list:
+                novel_info['tags'] = [tag.strip() for tag in tags_list if tag.strip()]
+        novel_info['word_number'] = None
+        word_count_match = self.WORD_COUNT.search(html)
+        if word_count_match:
+            try:
+                word_str = word_count_match.group(1).strip().replace(',', '')
+                novel_info['word_number'] = float(word_str) * 10000
+            except (ValueError, TypeError):
+                pass
+        novel_info['score'] = '无'
+        novel_info['scorer'] = '无'
+        for value, label in self.SCORE_ITEM.findall(html):
+            if label.strip() == '评分':
+                novel_info['score'] = value.strip()
+            elif label.strip() == '评分人数':
+                novel_info['scorer'] = value.strip()
+        status_match = self.STATUS.search(html)
+        novel_info['status'] = status_match.group(1).strip() if status_match else '无'
+        update_time_match = self.UPDATE_TIME.search(html)
+        novel_info['update_time_str'] = update_time_match.group(1).strip() if update_time_match else '无'
+        reviews = []
+        for review_match in islice(self.REVIEW.finditer(html), self.MAX_REVIEWS):
+            author, rating, content_block = review_match.groups()
+            content = _TAG_RE.sub('', content_block)
+            content = _LINE_BREAK_RE.sub('', content).strip()
+            content = _FULLTEXT_RE.sub('...', content).strip()
+            if content:
+                reviews.append({'author': author.strip(), 'content': content, 'rating': rating})
+        novel_info['reviews'] = reviews
+        synopsis_match = self.SYNOPSIS.search(html)
+        novel_info['synopsis'] = synopsis_match.group(1).strip() if synopsis_match else '无'
+        link_match = self.LINK.search(html) if 'rel="nofollow"' in html else None
+        novel_info['link'] = link_match.group(1).strip() if link_match else '无'
+        return novel_info
+
+    def parse_latest_id(self, html: str) -> Optional[int]:
+        matches = self.NOVEL_LINK.findall(html)
+        return max(int(novel_id) for novel_id in matches) if matches else None
+
+
+class YoushuExtractor:
+    """
+    youshu.me (api == 2) 页面解析器，覆盖搜索列表页、详情页与首页。
+    """
+    RESULTS_PER_PAGE = 20
+    LIST_MARKER = '共有<b class="hot">'
+    TOTAL = re.compile(r'共有<b class="hot">\s*(\d+)\s*</b>条结果')
+    RESULT_BLOCK = re.compile(r'<div class="c_row">.*?<div class="cb"></div>', re.DOTALL)
+    RESULT_NAME = re.compile(r'<span class="c_subject"><a href="/book/(\d+)">(.*?)</a></span>', re.DOTALL)
+    RESULT_AUTHOR = re.compile(r'<span class="c_label">作者：</span><span class="c_value">(.*?)</span>', re.DOTALL)
+    RESULT_SCORE = re.compile(r'<span class="c_rr">([\d.]+)</span>')
+    RESULT_SCORER = re.compile(r'<span class="stard">\((\d+)人评分\)</span>')
+    TITLE = re.compile(r'<title>(.*?)-.*?-优书网</title>')
+    BOOK_ID = re.compile(r"uservote\.php\?id=(\d+)|rating\('\d+',\s*'(\d+)'\)|addbookcase\.php\?bid=(\d+)")
+    AUTHOR = re.compile(r'作者：<a.*?>(.*?)</a>')
+    SCORE = re.compile(r'<span class="ratenum">(.*?)</span>')
+    SCORER = re.compile(r'\((.*?)人已评\)')
+    UPDATE_TIME = re.compile(r'最后更新：(.*?)</td>')
+    SYNOPSIS = re.compile(r'<div class="tabvalue"[^>]*?>\s*<div[^>]*?>(.*?)</div>', re.DOTALL)
+    LINK = re.compile(r'<a class="btnlink b_hot mbs" href="(.*?)"')
+    IMAGE = re.compile(r'<a[^>]*?class="book-detail-img"[^>]*?><img src="(.*?)"')
+    INFO_EXP = re.compile(r'<div class="author-item-exp">(.*?)</div>', re.DOTALL)
+    TAG_SECTION = re.compile(r'<b>标签：</b>(.*?)</div>', re.DOTALL)
+    TAG = re.compile(r'<a[^>]*?>(.*?)</a>')
+    REVIEW_BLOCK = re.compile(r'<div class="c_row cf">.*?<div class="c_tag">', re.DOTALL)
+    REVIEW_AUTHOR = re.compile(r'<p>(.*?)</p></a>\s*<p><div class="user-level">', re.DOTALL)
+    REVIEW_RATING = re.compile(r'<span title="(\d+)\s*颗星"', re.DOTALL)
+    REVIEW_CONTENT = re.compile(r'<div class="c_description">(.*?)</div>', re.DOTALL)
+    NEW_BOOK_SECTION = re.compile(r'<div class="blocktitle">新书自助推荐.*?</div>\s*<div class="blockcontent">.*?</ul>', re.DOTALL)
+    BOOK_LINK = re.compile(r'href="/book/(\d+)"')
+    MAX_REVIEWS = 5
+    # 详情页读到第 MAX_REVIEWS 条书评结束即可停止；首页读完"新书自助推荐"区块即可停止
+    DETAIL_UNTIL = (('<div class="c_row cf">', MAX_REVIEWS), ('<div class="c_tag">', 1))
+    LATEST_ID_UNTIL = (('<div class="blocktitle">新书自助推荐', 1), ('<div class="blockcontent">', 1), ('</ul>', 1))
+    DETAIL_FIELDS = ('novel_name', 'author_name', 'status', 'update_time_str', 'synopsis', 'tags')
+
+    def is_search_list(self, html: str) -> bool:
+        return self.LIST_MARKER in html
+
+    def parse_search(self, html: str) -> tuple[List[Dict], int]:
+        """
+        解析搜索页。返回 (results, total_pages)；搜索直接跳转到详情页时返回该书一条结果，
+        既不是列表也不是详情页时返回 ([], 0)。
+        """
+        if not self.is_search_list(html):
+            return self._parse_search_redirect(html)
+        total_results = 0
+        total_match = self.TOTAL.search(html)
+        if total_match:
+            total_results = int(total_match.group(1))
+        total_pages = (total_results + self.RESULTS_PER_PAGE - 1) // self.RESULTS_PER_PAGE if total_results > 0 else 1
+
+        results = []
+        for block_match in self.RESULT_BLOCK.finditer(html):
+            block = block_match.group(0)
+            book_info = {}
+            name_match = self.RESULT_NAME.search(block)
+            if name_match:
+                book_info['id'] = int(name_match.group(1))
+                book_info['novel_name'] = clean_html(name_match.group(2))
+            author_match = self.RESULT_AUTHOR.search(block)
+            if author_match:
+                book_info['author_name'] = clean_html(author_match.group(1))
+            score_match = self.RESULT_SCORE.search(block)
+            if score_match:
+                book_info['score'] = score_match.group(1)
+            scorer_match = self.RESULT_SCORER.search(block)
+            if scorer_match:
+                book_info['scorer'] = scorer_match.group(1)
+            if 'id' in book_info and 'novel_name' in book_info:
+                results.append(book_info)
+        return results, total_pages
+
+    def _parse_search_redirect(self, html: str) -> tuple[List[Dict], int]:
+        name_match = self.TITLE.search(html)
+        id_match = self.BOOK_ID.search(html) if name_match else None
+        if name_match and id_match:
+            novel_id_str = next((gid for gid in id_match.groups() if gid is not None), None)
+            if novel_id_str:
+                return [{'id': int(novel_id_str), 'novel_name': clean_html(name_match.group(1))}], 1
+        return [], 0
+
+    def parse_detail(self, html: str, base_url: str) -> Dict:
+        novel_info = {}
+        name_match = self.TITLE.search(html)
+        novel_info['novel_name'] = clean_html_content(name_match.group(1)) if name_match else '无'
+        author_match = self.AUTHOR.search(html)
+        novel_info['author_name'] = clean_html_content(author_match.group(1)) if author_match else '无'
+        score_match = self.SCORE.search(html)
+        scorer_match = _search_before_anchor(self.SCORER, html, '人已评)')
+        novel_info['score'] = clean_html_content(score_match.group(1)) if score_match else '无'
+        novel_info['scorer'] = clean_html_content(scorer_match.group(1)) if scorer_match else '无'
+        update_time_match = self.UPDATE_TIME.search(html)
+        novel_info['update_time_str'] = clean_html_content(update_time_match.group(1)) if update_time_match else '无'
+        synopsis_match = self.SYNOPSIS.search(html)
+        novel_info['synopsis'] = clean_html_content(synopsis_match.group(1)) if synopsis_match else '无'
+        link_match = self.LINK.search(html)
+        novel_info['link'] = clean_html_content(link_match.group(1)) if link_match else '无'
+        img_match = self.IMAGE.search(html)
+        novel_info['image_url'] = urljoin(base_url, img_match.group(1).strip()) if img_match and img_match.group(1).strip() else None
+        novel_info.update({'platform': '无', 'category': '无', 'status': '无', 'word_number': None})
+        info_exp_match = self.INFO_EXP.search(html)
+        if info_exp_match:
+            raw_text = info_exp_match.group(1).replace('<i class="author-item-line"></i>', '|')
+            for part in _TAG_RE.sub('', raw_text).split('|'):
+                part = part.strip()
+                if not part:
+                    continue
+                if part in YS_PLATFORMS:
+                    novel_info['platform'] = part
+                elif part in YS_CATEGORIES:
+                    novel_info['category'] = part
+                elif part in YS_STATUSES:
+                    novel_info['status'] = part
+                elif '字' in part:
+                    word_match = _DIGITS_RE.search(part)
+                    if word_match:
+                        novel_info['word_number'] = float(word_match.group(1))
+        novel_info['tags'] = []
+        tag_section_match = self.TAG_SECTION.search(html)
+        if tag_section_match:
+            tags = self.TAG.findall(tag_section_match.group(1))
+            if tags:
+                novel_info['tags'] = [clean_html_content(tag) for tag in tags]
+        reviews = []
+        for block_match in islice(self.REVIEW_BLOCK.finditer(html), self.MAX_REVIEWS):
+            block = block_match.group(0)
+            author_match = self.REVIEW_AUTHOR.search(block)
+            rating_match = self.REVIEW_RATING.search(block)
+            content_match = self.REVIEW_CONTENT.search(block)
+            if author_match and rating_match and content_match:
+                content = clean_html_content(content_match.group(1))
+                if content and content != '无':
+                    reviews.append({
+                        'author': clean_html_content(author_match.group(1)),
+                        'content': content,
+                        'rating': rating_match.group(1),
+                    })
+        novel_info['reviews'] = reviews
+        return novel_info
+
+    def parse_latest_id(self, html: str) -> Optional[int]:
+        section_match = self.NEW_BOOK_SECTION.search(html)
+        if not section_match:
+            return None
+        matches = self.BOOK_LINK.findall(html, section_match.start(), section_match.end())
+        return max(int(novel_id) for novel_id in matches) if matches else None
+
+
+class UaaExtractor:
+    """
+    hs 站 (uaa.com) /novel/intro 详情页解析器。
+    """
+    TITLE = re.compile(r'<h1>(.*?)</h1>')
+    AUTHOR = re.compile(r'作者：\s*<a.*?>(.*?)</a>')
+    STATUS = re.compile(r'<span class="update_state">状态：(.*?)</span>')
+    SCORE = re.compile(r'评分：<span>(.*?)</span>')
+    INTRO = re.compile(r'<div class="txt ellipsis">小说简介：(.*?)(?:</div>|<div class="arrow")', re.DOTALL)
+    TAG = re.compile(r'<li><a href="/novel/list\?tag=.*?"><b>#</b>(.*?)</a></li>')
+    CATEGORY_BLOCK = re.compile(r'<div class="item">\s*题材：\s*(.*?)</div>', re.DOTALL)
+    CATEGORY = re.compile(r'<a.*?>(.*?)</a>')
+    LATEST = re.compile(r'<div class="item">\s*最新：(.*?)\s*</div>')
+
+    @staticmethod
+    def _clean_text(text: Optional[str]) -> str:
+        return text.strip() if text else '无'
+
+    def parse_intro(self, html: str) -> Dict:
+        clean_text = self._clean_text
+        novel_info = {}
+        title_match = self.TITLE.search(html)
+        novel_info['title'] = clean_text(title_match.group(1)) if title_match else '无'
+        author_match = self.AUTHOR.search(html)
+        novel_info['author'] = clean_text(author_match.group(1)) if author_match else '无'
+        status_match = self.STATUS.search(html)
+        novel_info['status'] = clean_text(status_match.group(1)) if status_match else '无'
+        score_match = self.SCORE.search(html)
+        novel_info['score'] = clean_text(score_match.group(1)) if score_match else '无'
+        intro_match = self.INTRO.search(html)
+        novel_info['intro'] = clean_text(intro_match.group(1)) if intro_match else '无'
+        novel_info['tags'] = self.TAG.findall(html)
+        category_block_match = self.CATEGORY_BLOCK.search(html)
+        if category_block_match:
+            novel_info['categories'] = [cat.strip() for cat in self.CATEGORY.findall(category_block_match.group(1))]
+        else:
+            novel_info['categories'] = []
+        update_match = self.LATEST.search(html)
+        novel_info['latest_update'] = clean_text(update_match.group(1)) if update_match else '无'
+        return novel_info
+
+
+YPSHUO = YpshuoExtractor()
+YOUSHU = YoushuExtractor()
+UAA = UaaExtractor()
+
+
+# 以下为无状态的纯函数入口，参数与返回值均可序列化，可直接提交到线程池或进程池执行。
+
+def decode_html(body: bytes, charset: Optional[str] = None) -> str:
+    return body.decode(charset or 'utf-8', errors='replace')
+
+
+def parse_search_page(html: str, api: int) -> tuple[List[Dict], int]:
+    """
+    解析 HTML 搜索页，目前只有 youshu.me (api == 2) 的搜索结果是 HTML。
+    """
+    if api != 2:
+        raise ValueError(f"api {api} 的搜索结果不是 HTML 页面")
+    return YOUSHU.parse_search(html)
+
+
+def parse_novel_detail(html: str, api: int, base_url: str) -> Dict:
+    extractor = YPSHUO if api == 1 else YOUSHU
+    return extractor.parse_detail(html, base_url)
+
+
+def parse_hs_intro(html: str) -> Dict:
+    return UAA.parse_intro(html)
+
+
+def parse_latest_id(html: str, api: int) -> Optional[int]:
+    extractor = YPSHUO if api == 1 else YOUSHU
+    return extractor.parse_latest_id(html)
+
+
+def detail_until(api: int):
+    """
+    详情页流式读取的结束标记，见 net.fetch 的 until 参数。
+    """
+    return (YPSHUO if api == 1 else YOUSHU).DETAIL_UNTIL
+
+
+def latest_id_until(api: int):
+    return (YPSHUO if api == 1 else YOUSHU).LATEST_ID_UNTIL
+
+
+def detail_fields(api: int):
+    return (YPSHUO if api == 1 else YOUSHU).DETAIL_FIELDS
+
+
+def decode_and_parse(parse: Callable, body: bytes, charset: Optional[str], *args):
+    """
+    在同一个工作单元内完成解码与解析，避免把解码后的大字符串在进程间来回传递。
+    """
+    return parse(decode_html(body, charset), *args)
+
+
+def timed_decode_and_parse(parse: Callable, body: bytes, charset: Optional[str], *args):
+    """
+    同 decode_and_parse，另外返回解码与解析各自的耗时（秒）：(结果, 解码耗时, 解析耗时)。
+    """
+    started = time.perf_counter()
+    html = decode_html(body, charset)
+    decoded = time.perf_counter()
+    result = parse(html, *args)
+    return result, decoded - started, time.perf_counter() - decoded
+
+
+def encode_base64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
@@ -0,0 +1,45 @@
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from id_index import NovelIdIndex  # noqa: E402
+
+
+def _index_with_viewed_books(tmp_path, upper: int, viewed: int) -> NovelIdIndex:
+    index = NovelIdIndex(tmp_path, "test")
+    index.loaded = True
+    for novel_id in random.sample(range(1, upper + 1), viewed):
+        index.mark_valid(novel_id)
+    return index
+
+
+def test_random_candidates_are_spread_out_when_index_is_sparse(tmp_path):
+    random.seed(1)
+    upper = 100000
+    index = _index_with_viewed_books(tmp_path, upper, viewed=2)
+    picks = [index.random_candidate(upper, prefer_known=0.9) for _ in range(200)]
+    # 索引只覆盖极少数ID时，几乎不应抽到用户看过的那两本书
+    assert len(set(picks)) >= 190
+    assert max(Counter(picks).values()) <= 3
+
+
+def test_known_preference_scales_with_coverage(tmp_path):
+    random.seed(2)
+    upper = 1000
+    index = _index_with_viewed_books(tmp_path, upper, viewed=500)
+    picks = [index.random_candidate(upper, prefer_known=0.9) for _ in range(2000)]
+    known_share = sum(index.is_valid(novel_id) for novel_id in picks) / len(picks)
+    # 覆盖一半的ID时，从已知ID抽取的概率约为 0.9 × 0.5
+    assert 0.35 < known_share < 0.55
+
+
+def test_recently_returned_ids_are_excluded(tmp_path):
+    random.seed(3)
+    upper = 1000
+    index = _index_with_viewed_books(tmp_path, upper, viewed=1000)
+    recent = set(range(1, 51))
+    picks = [index.random_candidate(upper, prefer_known=1.0, exclude=recent) for _ in range(500)]
+    assert not recent.intersection(picks)
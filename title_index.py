@@ -0,0 +1,215 @@
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+_PUNCTUATION = set(" \t\r\n　《》<>〈〉「」『』【】[]()（）{}·•・:：;；,，.。!！?？'\"‘’“”-—_~～/\\|、")
+
+# (来源, API模式, 书籍ID)
+EntryKey = Tuple[str, int, str]
+
+
+def normalize_title(text: str) -> str:
+    """
+    书名/作者名归一化：忽略大小写、空白与常见标点。
+    """
+    return "".join(ch for ch in str(text).casefold() if ch not in _PUNCTUATION)
+
+
+def _grams(text: str) -> Set[str]:
+    """
+    单字加相邻二字组成的特征集合。中文书名很短，只用二元组时一个错字就会丢掉一半特征。
+    """
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class TitleIndex:
+    """
+    本地书名索引。书籍的来源、ID、书名与作者持久化在 SQLite 中，加载后在内存里维护字符 n-gram 倒排索引，
+    用于模糊（容错）匹配书名或"书名+作者"。
+
+    load()/flush() 为阻塞的数据库操作，应在事件循环外执行；add()/search() 只操作内存，
+    但 search()/best_match() 需要为候选条目打分，索引较大时也应在事件循环外执行。
+    """
+
+    def __init__(self, path: Path, max_entries: int = 20000, flush_interval: float = 300):
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[EntryKey, Dict]" = OrderedDict()
+        self._postings: Dict[str, Set[EntryKey]] = {}
+        self._pending: Dict[EntryKey, Dict] = {}
+        self._removed: Set[EntryKey] = set()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.loaded = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS books ("
+            "source TEXT NOT NULL, api INTEGER NOT NULL, id TEXT NOT NULL, "
+            "title TEXT NOT NULL, author TEXT NOT NULL, updated REAL NOT NULL, "
+            "PRIMARY KEY (source, api, id))"
+        )
+        return conn
+
+    def load(self) -> None:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT source, api, id, title, author, updated FROM books ORDER BY updated DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            for source, api, novel_id, title, author, updated in reversed(rows):
+                self._insert((source, api, novel_id), {"title": title, "author": author, "updated": updated})
+        self.loaded = True
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, removed = self._pending, self._removed
+            self._pending, self._removed = {}, set()
+        if pending or removed:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO books (source, api, id, title, author, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(*key, entry["title"], entry["author"], entry["updated"]) for key, entry in pending.items()],
+                    )
+                    conn.executemany("DELETE FROM books WHERE source = ? AND api = ? AND id = ?", list(removed))
+            finally:
+                conn.close()
+        self._last_flush = time.monotonic()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending or self._removed)
+
+    @property
+    def should_flush(self) -> bool:
+        return self.dirty and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _features(self, entry: Dict) -> Set[str]:
+        return _grams(entry["norm_title"]) | _grams(entry["norm_author"])
+
+    def _insert(self, key: EntryKey, entry: Dict) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._unlink(key, old)
+        entry["norm_title"] = normalize_title(entry["title"])
+        entry["norm_author"] = normalize_title(entry["author"])
+        self._entries[key] = entry
+        for gram in self._features(entry):
+            self._postings.setdefault(gram, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest_key, oldest = self._entries.popitem(last=False)
+            self._unlink(oldest_key, oldest)
+            self._pending.pop(oldest_key, None)
+            self._removed.add(oldest_key)
+
+    def _unlink(self, key: EntryKey, entry: Dict) -> None:
+        for gram in self._features(entry):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def add(self, source: str, api: int, novel_id, title: str, author: str = "") -> None:
+        title, author = str(title or "").strip(), str(author or "").strip()
+        if not title or title == '无' or novel_id in (None, ""):
+            return
+        if author == '无':
+            author = ""
+        key = (source, api, str(novel_id))
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current["title"] == title and (current["author"] == author or not author):
+                self._entries.move_to_end(key)
+                return
+            entry = {"title": title, "author": author, "updated": time.time()}
+            self._insert(key, entry)
+            self._pending[key] = entry
+            self._removed.discard(key)
+
+    def remove(self, source: str, api: int, novel_id) -> None:
+        key = (source, api, str(novel_id))
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            self._unlink(key, entry)
+            self._pending.pop(key, None)
+            self._removed.add(key)
+
+    def search(self, source: str, query: str, apis: Tuple[int, ...] = (1, 2), limit: int = 5, max_candidates: int = 200) -> List[Tuple[float, EntryKey, Dict]]:
+        """
+        按相似度从高到低返回 (得分, key, 条目)。书名或"书名+作者"与查询完全一致时得分为 1，
+        否则取查询与书名、书名+作者两者特征集合 Dice 系数的较大值。
+        只为与查询共有特征最多的 max_candidates 个条目打分，避免常见单字命中大量条目时逐一计算。
+        """
+        norm_query = normalize_title(query)
+        if not norm_query:
+            return []
+        query_grams = _grams(norm_query)
+        overlap: Counter = Counter()
+        with self._lock:
+            for gram in query_grams:
+                overlap.update(key for key in self._postings.get(gram, ()) if key[0] == source and key[1] in apis)
+            candidates = [key for key, _ in overlap.most_common(max_candidates)]
+            if len(overlap) > max_candidates:
+                # 含有查询全部特征的条目可能与查询完全一致，不能因截断而漏掉
+                chosen = set(candidates)
+                candidates.extend(
+                    key for key, count in overlap.items()
+                    if count == len(query_grams) and key not in chosen and self._exact(self._entries[key], norm_query)
+                )
+            scored = []
+            for key in candidates:
+                entry = self._entries[key]
+                title, author = entry["norm_title"], entry["norm_author"]
+                if self._exact(entry, norm_query):
+                    score = 1.0
+                else:
+                    score = max(_dice(query_grams, _grams(title)), _dice(query_grams, _grams(title + author)))
+                scored.append((score, key, dict(entry)))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:limit]
+
+    @staticmethod
+    def _exact(entry: Dict, norm_query: str) -> bool:
+        title, author = entry["norm_title"], entry["norm_author"]
+        return norm_query in (title, title + author, author + title)
+
+    def best_match(self, source: str, query: str, min_score: float, margin: float = 0.1, apis: Tuple[int, ...] = (1, 2)) -> Optional[Tuple[float, EntryKey, Dict]]:
+        """
+        只有最佳匹配得分不低于 min_score，且明显优于其他书籍（同名同作者的其他来源条目除外）时才返回，
+        否则返回 None，由调用方回退到远程搜索。
+        """
+        results = self.search(source, query, apis=apis)
+        if not results or results[0][0] < min_score:
+            return None
+        best_score, _, best = results[0]
+        for score, _, entry in results[1:]:
+            same_book = entry["norm_title"] == best["norm_title"] and entry["norm_author"] == best["norm_author"]
+            if not same_book and score > best_score - margin:
+                return None
+        return results[0]